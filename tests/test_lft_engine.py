@@ -0,0 +1,36 @@
+"""Tests for utils.lft_engine helpers."""
+import math
+
+import pytest
+
+from utils import lft_engine
+
+
+@pytest.mark.parametrize("x, d, expected", [
+    (1.234, 2, 1.23),
+    (2.25, 1, 2.3),
+    (0.125, 2, 0.13),
+    (7.5, 0, 8.0),
+])
+def test_q_rounds_half_up(x, d, expected):
+    assert lft_engine._q(x, d) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("x", [math.inf, -math.inf])
+def test_q_passes_infinities_through(x):
+    assert lft_engine._q(x) == x
+    assert lft_engine._q(x, 1) == x
+
+
+def test_q_passes_nan_through():
+    assert math.isnan(lft_engine._q(math.nan))
+
+
+def test_analyze_lft_returns_differentials_as_dicts():
+    labs = {'alt': 400, 'ast': 300, 'alp': 90, 'total_bili': 1.0, 'direct_bili': 0.2,
+            'albumin': 4, 'pt': 12, 'inr': 1.0}
+    results = lft_engine.analyze_lft(labs, {'sex': 'male'}, include_education=False)
+    assert results['differentials']
+    for d in results['differentials']:
+        assert type(d) is dict
+        assert set(d) == {'condition', 'discussion'}
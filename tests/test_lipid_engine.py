@@ -0,0 +1,42 @@
+"""Tests for utils.lipid_engine scalar and batch classification."""
+import numpy as np
+import pytest
+
+from utils import lipid_engine
+
+_SEXES = ('Default', 'Male', 'Female')
+
+
+def _grid():
+    """Every threshold, +/-0.5 around it, and a few far-out values, for all parameters."""
+    points = {0.0, 1.0, 1000.0}
+    for bounds in lipid_engine.LIPID_THRESHOLDS.values():
+        for t in np.concatenate(bounds):
+            points.update((t - 0.5, t, t + 0.5))
+    points = sorted(p for p in points if np.isfinite(p))
+    return np.array([[p] * len(lipid_engine.LIPID_PARAMS) for p in points])
+
+
+@pytest.mark.parametrize("sex", _SEXES)
+def test_scalar_and_batch_classifiers_agree(sex):
+    values = _grid()
+    expected = [[lipid_engine._classify(param, v, sex)['status'] for param, v in zip(lipid_engine.LIPID_PARAMS, row)]
+                for row in values]
+
+    batch = lipid_engine.classify_lipid_batch(values, sex)
+    soa = {param: values[:, j] for j, param in enumerate(lipid_engine.LIPID_PARAMS)}
+    columnar = lipid_engine.analyze_lipid_batch(soa, np.full(len(values), sex))['statuses']
+
+    to_names = np.vectorize(lipid_engine.LIPID_STATUS_BY_CODE.get)
+    assert to_names(batch).tolist() == expected
+    assert to_names(columnar).tolist() == expected
+
+
+def test_analyze_lipid_batch_groups_mixed_sexes():
+    values = _grid()
+    sexes = np.array([_SEXES[i % 3] for i in range(len(values) - 1)] + ['unknown'])
+    soa = {param: values[:, j] for j, param in enumerate(lipid_engine.LIPID_PARAMS)}
+    statuses = lipid_engine.analyze_lipid_batch(soa, sexes)['statuses']
+    for i, sex in enumerate(sexes):
+        assert statuses[i].tolist() == lipid_engine.classify_lipid_batch(values[i], sex)[0].tolist()
+    assert np.all(lipid_engine.analyze_lipid_batch({}, sexes)['statuses'] == 3)
@@ -0,0 +1,156 @@
+"""Tests for utils.ocr_parser text extraction and parameter parsing."""
+import os
+import sys
+import types
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from utils import ocr_parser
+
+
+class _FakePage:
+    def __init__(self, text):
+        self._text = text
+
+    def extract_text(self):
+        return self._text
+
+
+class _FakePDF:
+    def __init__(self, texts):
+        self.pages = [_FakePage(t) for t in texts]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _page_texts(n_pages):
+    return [f"page {i} hemoglobin {i}.5" for i in range(n_pages)]
+
+
+@pytest.fixture
+def fake_pdfplumber(monkeypatch):
+    """Install a pdfplumber stand-in whose PDF has ``int(file_bytes)`` text pages."""
+    module = types.ModuleType("pdfplumber")
+    module.open = lambda stream: _FakePDF(_page_texts(int(stream.getvalue())))
+    monkeypatch.setitem(sys.modules, "pdfplumber", module)
+    monkeypatch.setattr(ocr_parser.os, "cpu_count", lambda: 4)
+    return module
+
+
+def _expected(n_pages):
+    return "\n".join(_page_texts(n_pages)) + "\n"
+
+
+def test_short_pdf_is_extracted_sequentially(fake_pdfplumber, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool used for a short PDF")
+
+    monkeypatch.setattr("concurrent.futures.ProcessPoolExecutor", no_pool)
+    assert ocr_parser._extract_text_from_pdf(b"3") == _expected(3)
+
+
+def test_pool_start_failure_falls_back_to_sequential_pages(fake_pdfplumber, monkeypatch):
+    def broken_pool(*args, **kwargs):
+        raise OSError("cannot start worker processes")
+
+    monkeypatch.setattr("concurrent.futures.ProcessPoolExecutor", broken_pool)
+    n_pages = ocr_parser._PDF_PARALLEL_MIN_PAGES + 3
+    # Page 0 is kept and the rest come from pdfplumber, not PyPDF2.
+    assert ocr_parser._extract_text_from_pdf(str(n_pages).encode()) == _expected(n_pages)
+
+
+def test_broken_pool_mid_run_falls_back_to_sequential_pages(fake_pdfplumber, monkeypatch):
+    class DyingPool:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def map(self, *args, **kwargs):
+            raise BrokenProcessPool("a worker died")
+
+    monkeypatch.setattr("concurrent.futures.ProcessPoolExecutor", DyingPool)
+    n_pages = ocr_parser._PDF_PARALLEL_MIN_PAGES
+    assert ocr_parser._extract_text_from_pdf(str(n_pages).encode()) == _expected(n_pages)
+
+
+def test_parse_parameters_accepts_raw_unicode_separators_and_digits():
+    params = ocr_parser.parse_parameters("Hemoglobin\u00a012.5\nWBC: \u0665")
+    assert params["Hemoglobin"]["value"] == 12.5
+    assert params["WBC"]["value"] == 5.0
+
+
+def _install_pdf(monkeypatch, texts):
+    module = types.ModuleType("pdfplumber")
+    module.open = lambda stream: _FakePDF(texts)
+    monkeypatch.setitem(sys.modules, "pdfplumber", module)
+
+
+def test_scanned_cover_page_does_not_skip_later_text_pages(monkeypatch):
+    texts = ["", "page 1 glucose 90", "page 2 tsh 2.1"]
+    _install_pdf(monkeypatch, texts)
+    assert ocr_parser._extract_text_from_pdf(b"") == "page 1 glucose 90\npage 2 tsh 2.1\n"
+
+
+def test_scanned_pdf_stops_after_probe_pages(monkeypatch):
+    seen = []
+
+    class CountingPage(_FakePage):
+        def extract_text(self):
+            seen.append(self)
+            return ""
+
+    pdf = _FakePDF([])
+    pdf.pages = [CountingPage("") for _ in range(10)]
+    module = types.ModuleType("pdfplumber")
+    module.open = lambda stream: pdf
+    monkeypatch.setitem(sys.modules, "pdfplumber", module)
+    ocr_parser._extract_text_from_pdf(b"")
+    assert len(seen) == ocr_parser._PDF_SCAN_PROBE_PAGES
+
+
+def test_prepare_for_ocr_flattens_transparency_onto_white():
+    Image = pytest.importorskip("PIL.Image")
+    image = Image.new("RGBA", (40, 20), (0, 0, 0, 0))
+    image.paste((0, 0, 0, 255), (10, 5, 30, 15))
+    gray = ocr_parser._prepare_for_ocr(image).convert("L")
+    assert gray.getpixel((0, 0)) == 255
+    assert gray.getpixel((20, 10)) == 0
+
+
+@pytest.fixture
+def fresh_ocr_pool(monkeypatch):
+    """Start each test without a shared OCR pool and shut down any it creates."""
+    monkeypatch.setattr(ocr_parser, "_OCR_POOL", None)
+    yield
+    if ocr_parser._OCR_POOL is not None:
+        ocr_parser._OCR_POOL.shutdown()
+
+
+def test_thread_limit_is_set_in_ocr_workers_only(fresh_ocr_pool, monkeypatch):
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setattr(ocr_parser, "OCR_SINGLE_THREAD_TESSERACT", True)
+    assert ocr_parser._run_ocr(os.getenv, [("OMP_THREAD_LIMIT",)]) == ["1"]
+    assert "OMP_THREAD_LIMIT" not in os.environ
+
+
+def test_ocr_pool_start_failure_runs_in_process(fresh_ocr_pool, monkeypatch):
+    class BrokenPool:
+        def submit(self, *args):
+            raise OSError("cannot start worker processes")
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(ocr_parser, "_OCR_POOL", BrokenPool())
+    assert ocr_parser._run_ocr(str.upper, [("a",), ("b",)]) == ["A", "B"]
+    assert ocr_parser._OCR_POOL is None
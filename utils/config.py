@@ -24,6 +24,11 @@ DEFAULT_ACTIVE_PANELS = ["CBC", "LFT", "KFT", "LIPID", "DIABETES", "TFT"]
 
 # ── OCR Settings ─────────────────────────────────────────────────────────────
 OCR_MAX_TEXT_PREVIEW = 3000
+OCR_CACHE_SIZE = int(os.getenv("LABIQ_OCR_CACHE_SIZE", "32"))  # 0 disables upload caching
+# Run each Tesseract single-threaded (OMP_THREAD_LIMIT=1) since PDF pages are
+# already OCR'd one per core. Applied only inside the OCR worker processes, so
+# numba/BLAS threads in the app process are unaffected.
+OCR_SINGLE_THREAD_TESSERACT = os.getenv("LABIQ_OCR_SINGLE_THREAD_TESSERACT", "1") == "1"
 
 # ── Report Settings ──────────────────────────────────────────────────────────
 DEFAULT_REPORT_TITLE = "Comprehensive Lab Investigation Report"
@@ -0,0 +1,20 @@
+"""
+JIT Compatibility Shim
+======================
+Exposes ``njit``/``prange`` from Numba when it is installed, and no-op
+stand-ins otherwise, so numeric kernels in the analysis engines run as plain
+Python on deployments without Numba.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback decorator: return the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
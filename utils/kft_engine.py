@@ -2,7 +2,11 @@
 Kidney Function Test (KFT) Analysis Engine
 Renal markers + Electrolytes with comprehensive differential diagnosis.
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.jit import njit, prange
 
 KFT_REFERENCE_RANGES = {
     'Creatinine': {
@@ -156,19 +160,86 @@ def _get_ref(param: str, sex: str = 'Default') -> Dict:
     return {}
 
 
+# ── Columnar reference store ────────────────────────────────────────
+# KFT_REFERENCE_RANGES repacked once into aligned threshold vectors per sex
+# (low, high, critical_low, critical_high), indexed via _PARAM_INDEX, so
+# batch callers can compare whole value arrays without dict lookups.
+KFT_PARAMS = tuple(KFT_REFERENCE_RANGES)
+_PARAM_INDEX = {param: i for i, param in enumerate(KFT_PARAMS)}
+
+
+def _build_threshold_arrays(sex: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    refs = [_get_ref(param, sex) for param in KFT_PARAMS]
+    return tuple(np.array([ref[key] for ref in refs], dtype=np.float64)
+                 for key in ('low', 'high', 'critical_low', 'critical_high'))
+
+
+KFT_THRESHOLDS = {sex: _build_threshold_arrays(sex) for sex in ('Default', 'Male', 'Female')}
+
+
+def get_kft_thresholds(sex: str = 'Default') -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return the (low, high, critical_low, critical_high) vectors for a sex, aligned with KFT_PARAMS."""
+    return KFT_THRESHOLDS.get(sex, KFT_THRESHOLDS['Default'])
+
+
+# Status codes emitted by the batch classifier (same precedence as _classify).
+KFT_STATUS_BY_CODE = {
+    -2: 'critical_low', -1: 'low', 0: 'normal', 1: 'high', 2: 'critical_high', 3: 'unknown',
+}
+
+
+@njit(cache=True, parallel=True)
+def _classify_kernel(values, low, high, clow, chigh, out_status):
+    n_rows, n_cols = values.shape
+    for i in prange(n_rows):
+        for j in range(n_cols):
+            v = values[i, j]
+            if v != v:  # NaN marks a missing result
+                out_status[i, j] = 3
+            elif v < clow[j]:
+                out_status[i, j] = -2
+            elif v > chigh[j]:
+                out_status[i, j] = 2
+            elif v < low[j]:
+                out_status[i, j] = -1
+            elif v > high[j]:
+                out_status[i, j] = 1
+            else:
+                out_status[i, j] = 0
+
+
+def classify_kft_batch(values, sex: str = 'Default') -> np.ndarray:
+    """Classify a cohort in one call.
+
+    ``values`` is an (N, len(KFT_PARAMS)) matrix (or a single row) in
+    KFT_PARAMS column order, with NaN for missing results. Returns an int8
+    matrix of status codes; see KFT_STATUS_BY_CODE.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values.reshape(1, -1)
+    out = np.empty(values.shape, dtype=np.int8)
+    _classify_kernel(values, *get_kft_thresholds(sex), out)
+    return out
+
+
+_NEG_INF = float('-inf')
+_POS_INF = float('inf')
+
+
 def _classify(param: str, value: float, sex: str = 'Default') -> Dict:
     ref = _get_ref(param, sex)
     if not ref:
         return {'status': 'unknown', 'message': 'No reference range', 'color': 'gray'}
     result = {'value': value, 'unit': ref.get('unit', ''), 'low': ref.get('low'), 'high': ref.get('high'),
               'critical_low': ref.get('critical_low'), 'critical_high': ref.get('critical_high')}
-    if value < ref.get('critical_low', float('-inf')):
+    if value < ref.get('critical_low', _NEG_INF):
         result.update({'status': 'critical_low', 'message': f'CRITICAL LOW: {value} (Ref: {ref["low"]}-{ref["high"]})', 'color': 'red'})
-    elif value > ref.get('critical_high', float('inf')):
+    elif value > ref.get('critical_high', _POS_INF):
         result.update({'status': 'critical_high', 'message': f'CRITICAL HIGH: {value} (Ref: {ref["low"]}-{ref["high"]})', 'color': 'red'})
     elif value < ref.get('low', 0):
         result.update({'status': 'low', 'message': f'LOW: {value} (Ref: {ref["low"]}-{ref["high"]})', 'color': 'orange'})
-    elif value > ref.get('high', float('inf')):
+    elif value > ref.get('high', _POS_INF):
         result.update({'status': 'high', 'message': f'HIGH: {value} (Ref: {ref["low"]}-{ref["high"]})', 'color': 'orange'})
     else:
         result.update({'status': 'normal', 'message': f'NORMAL: {value} (Ref: {ref["low"]}-{ref["high"]})', 'color': 'green'})
@@ -202,7 +273,7 @@ def analyze_kft(parameters: Dict, sex: str = 'Default') -> Dict:
     bun = parameters.get('BUN', {}).get('value')
     cr = parameters.get('Creatinine', {}).get('value')
     calc_indices = {}
-    if bun and cr and cr > 0:
+    if bun is not None and cr is not None and cr > 0:
         ratio = round(bun / cr, 1)
         interp = ('Prerenal (dehydration, CHF, GI bleed)' if ratio > 20 else
                   'Normal' if ratio >= 10 else
@@ -216,7 +287,7 @@ def analyze_kft(parameters: Dict, sex: str = 'Default') -> Dict:
     na = parameters.get('Sodium', {}).get('value')
     cl = parameters.get('Chloride', {}).get('value')
     hco3 = parameters.get('Bicarbonate', {}).get('value')
-    if na and cl and hco3:
+    if na is not None and cl is not None and hco3 is not None:
         ag = round(na - (cl + hco3), 1)
         calc_indices['Anion Gap'] = {
             'value': ag, 'formula': 'Na - (Cl + HCO3)',
@@ -229,7 +300,7 @@ def analyze_kft(parameters: Dict, sex: str = 'Default') -> Dict:
     # Corrected calcium
     ca = parameters.get('Calcium', {}).get('value')
     alb_data = parameters.get('Albumin', {}).get('value')
-    if ca and alb_data and alb_data < 4.0:
+    if ca is not None and alb_data is not None and 0 < alb_data < 4.0:
         corrected = round(ca + 0.8 * (4.0 - alb_data), 1)
         calc_indices['Corrected Calcium'] = {
             'value': corrected, 'formula': 'Ca + 0.8 × (4.0 - Albumin)',
@@ -239,7 +310,7 @@ def analyze_kft(parameters: Dict, sex: str = 'Default') -> Dict:
 
     # CKD staging from eGFR
     egfr = parameters.get('eGFR', {}).get('value')
-    if egfr:
+    if egfr is not None:
         if egfr >= 90: stage = 'G1 (Normal or high)'
         elif egfr >= 60: stage = 'G2 (Mildly decreased)'
         elif egfr >= 45: stage = 'G3a (Mild-moderately decreased)'
@@ -252,20 +323,21 @@ def analyze_kft(parameters: Dict, sex: str = 'Default') -> Dict:
         }
 
     # Quality checks
-    if bun and cr:
+    if bun is not None and cr is not None and cr > 0:
+        bun_cr = bun / cr
         quality_checks.append({
             'rule': 'BUN/Creatinine Ratio Assessment',
-            'severity': 'pass' if 10 <= (bun/cr if cr > 0 else 0) <= 20 else 'warning',
-            'interpretation': f'BUN/Cr ratio: {bun/cr:.1f}. ' + (
-                'Normal range.' if 10 <= bun/cr <= 20 else
-                'Elevated: consider prerenal causes, GI bleeding.' if bun/cr > 20 else
+            'severity': 'pass' if 10 <= bun_cr <= 20 else 'warning',
+            'interpretation': f'BUN/Cr ratio: {bun_cr:.1f}. ' + (
+                'Normal range.' if 10 <= bun_cr <= 20 else
+                'Elevated: consider prerenal causes, GI bleeding.' if bun_cr > 20 else
                 'Low: consider liver disease, malnutrition, intrinsic renal.')
         })
 
     # Pattern summary
     patterns = []
-    if cr and _classify('Creatinine', cr, sex)['status'] in ('high', 'critical_high'):
-        if bun and cr > 0 and bun / cr > 20:
+    if cr is not None and _classify('Creatinine', cr, sex)['status'] in ('high', 'critical_high'):
+        if bun is not None and cr > 0 and bun / cr > 20:
             patterns.append('**Prerenal azotemia pattern**: elevated BUN/Cr ratio >20:1')
         else:
             patterns.append('**Renal impairment**: elevated creatinine')
@@ -273,10 +345,10 @@ def analyze_kft(parameters: Dict, sex: str = 'Default') -> Dict:
     na_val = parameters.get('Sodium', {}).get('value')
     k_val = parameters.get('Potassium', {}).get('value')
     electrolyte_issues = []
-    if na_val and na_val < 136: electrolyte_issues.append('hyponatremia')
-    if na_val and na_val > 145: electrolyte_issues.append('hypernatremia')
-    if k_val and k_val < 3.5: electrolyte_issues.append('hypokalemia')
-    if k_val and k_val > 5.0: electrolyte_issues.append('hyperkalemia')
+    if na_val is not None and na_val < 136: electrolyte_issues.append('hyponatremia')
+    if na_val is not None and na_val > 145: electrolyte_issues.append('hypernatremia')
+    if k_val is not None and k_val < 3.5: electrolyte_issues.append('hypokalemia')
+    if k_val is not None and k_val > 5.0: electrolyte_issues.append('hyperkalemia')
     if electrolyte_issues:
         patterns.append(f'**Electrolyte abnormalities**: {", ".join(electrolyte_issues)}')
     
@@ -3,11 +3,61 @@ Liver Function Test (LFT) Analysis Engine
 Ported from the HTML/JavaScript LFT Analyzer with full Python logic.
 """
 
-from typing import Dict, List, Optional
+from collections import namedtuple
+from functools import lru_cache
+from math import floor, isfinite
+from types import MappingProxyType
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+__all__ = [
+    'LFT_REFERENCE_RANGES', 'LFT_DIFFERENTIALS',
+    'Differential', 'RCalc', 'Severity', 'PathwayInfo', 'Recommendation',
+    'get_ref_range', 'calculate_r_value', 'determine_lft_pattern', 'determine_severity',
+    'determine_pathway', 'get_abnormalities', 'build_severity_table',
+    'get_abnormalities_batch', 'build_severity_table_batch', 'assess_synthetic_function',
+    'get_ast_alt_interpretation', 'get_lft_differential_diagnosis',
+    'generate_lft_recommendations', 'generate_lft_educational_content',
+    'analyze_lft', 'analyze_lft_json',
+]
+
+
+# Pattern, flag and sex vocabulary shared by the tables and analyze_lft.
+_P_HEP = 'hepatocellular'
+_P_CHOL = 'cholestatic'
+_P_MIXED = 'mixed'
+_P_ISOLATED = 'isolated_hyperbilirubinemia'
+_YES = 'yes'
+_MALE = 'male'
+_FEMALE = 'female'
+
+
+def _frozen(obj):
+    """Recursively wrap dicts in read-only proxies and turn lists into tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _frozen(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_frozen(v) for v in obj)
+    return obj
 
 
 # ── Reference Ranges ────────────────────────────────────────────────
-LFT_REFERENCE_RANGES = {
+# Static tables below are read-only (MappingProxyType / tuples), so callers can
+# share them without defensive copies.
+LFT_REFERENCE_RANGES = _frozen({
     'ALT': {
         'male': {'low': 0, 'high': 33, 'unit': 'IU/L'},
         'female': {'low': 0, 'high': 25, 'unit': 'IU/L'},
@@ -38,11 +88,43 @@ LFT_REFERENCE_RANGES = {
         'male': {'low': 0, 'high': 60, 'unit': 'IU/L'},
         'female': {'low': 0, 'high': 40, 'unit': 'IU/L'},
     },
+})
+
+# Flattened view of LFT_REFERENCE_RANGES: (param, sex) -> (low, high, unit).
+_REF_RANGES_FLAT = {
+    (param, sex): (ref['low'], ref['high'], ref['unit'])
+    for param, by_sex in LFT_REFERENCE_RANGES.items()
+    for sex, ref in by_sex.items()
+}
+
+
+def get_ref_range(param: str, sex: str = 'default') -> Optional[Tuple[float, float, str]]:
+    """Get (low, high, unit) for an LFT parameter, falling back to its default range."""
+    return _REF_RANGES_FLAT.get((param, sex)) or _REF_RANGES_FLAT.get((param, 'default'))
+
+
+# Upper limits of normal used by the pattern/severity logic:
+# (ALT, AST, ALP, total bilirubin, direct bilirubin). Any sex other than
+# 'male' takes the female limits.
+_ULN_PARAMS = ('ALT', 'AST', 'ALP', 'Total_Bilirubin', 'Direct_Bilirubin')
+_ULNS = {
+    sex: tuple(get_ref_range(param, sex)[1] for param in _ULN_PARAMS)
+    for sex in (_MALE, _FEMALE)
 }
 
+# Per-call context: the patient's ULNs resolved once and threaded through the
+# analysis helpers.
+_Ctx = namedtuple('_Ctx', 'alt_uln ast_uln alp_uln tbili_uln dbili_uln sex')
+_CTX_BY_SEX = {sex: _Ctx(*ulns, sex) for sex, ulns in _ULNS.items()}
+
+
+def _ctx_for(sex: str) -> _Ctx:
+    ctx = _CTX_BY_SEX.get(sex)
+    return ctx if ctx is not None else _Ctx(*_ULNS[_FEMALE], sex)
+
 # ── Differential Diagnosis Database ─────────────────────────────────
-LFT_DIFFERENTIALS = {
-    'hepatocellular': [
+LFT_DIFFERENTIALS = _frozen({
+    _P_HEP: [
         {
             'condition': 'Viral Hepatitis (A, B, C, E)',
             'discussion': 'Most common infectious cause of hepatocellular injury worldwide. ALT is typically higher '
@@ -89,7 +171,7 @@ LFT_DIFFERENTIALS = {
                           'LDH is markedly elevated. ALT/LDH ratio <1.5. Rapid improvement with hemodynamic support.'
         }
     ],
-    'cholestatic': [
+    _P_CHOL: [
         {
             'condition': 'Choledocholithiasis (Common Bile Duct Stones)',
             'discussion': 'Most common cause of extrahepatic cholestasis. RUQ ultrasound is first-line imaging. '
@@ -124,7 +206,7 @@ LFT_DIFFERENTIALS = {
                           'Treatment: UDCA. Delivery typically recommended at 36-37 weeks.'
         }
     ],
-    'mixed': [
+    _P_MIXED: [
         {
             'condition': 'Drug-Induced Liver Injury (Mixed Pattern)',
             'discussion': 'Many drugs produce a mixed hepatocellular-cholestatic pattern. Phenytoin, sulfonamides, '
@@ -146,7 +228,7 @@ LFT_DIFFERENTIALS = {
                           'Imaging and liver biopsy for diagnosis.'
         }
     ],
-    'isolated_hyperbilirubinemia': [
+    _P_ISOLATED: [
         {
             'condition': 'Gilbert Syndrome',
             'discussion': 'Most common hereditary hyperbilirubinemia (affects ~5-10% of population). Unconjugated '
@@ -175,34 +257,237 @@ LFT_DIFFERENTIALS = {
                           'unconjugated hyperbilirubinemia from destruction of RBC precursors in the marrow.'
         }
     ]
+})
+
+Differential = namedtuple('Differential', 'condition discussion')
+
+# Read-only view of LFT_DIFFERENTIALS built once for rendering.
+_DIFFERENTIALS_BY_PATTERN = {
+    pattern: tuple(Differential(d['condition'], d['discussion']) for d in rows)
+    for pattern, rows in LFT_DIFFERENTIALS.items()
 }
 
 
-def calculate_r_value(alt: float, alp: float, sex: str = 'male') -> Dict:
-    """Calculate the R value for LFT pattern classification."""
-    alt_uln = 33 if sex == 'male' else 25
-    alp_uln = 120
+# ── Result Types ────────────────────────────────────────────────────
+# Intermediate results are immutable NamedTuple records; the public helpers and
+# analyze_lft convert them to plain dicts at the API boundary.
+class RCalc(NamedTuple):
+    r_value: float
+    alt_ratio: float
+    alp_ratio: float
+    alt_uln: float
+    alp_uln: float
+    alt: Optional[float] = None
+    alp: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        d = {
+            'r_value': self.r_value,
+            'alt_ratio': self.alt_ratio,
+            'alp_ratio': self.alp_ratio,
+            'alt_uln': self.alt_uln,
+            'alp_uln': self.alp_uln,
+        }
+        if self.alt is not None:
+            d['alt'] = self.alt
+            d['alp'] = self.alp
+        return d
+
+
+class Severity(NamedTuple):
+    grade: str
+    description: str
+    max_fold: float
+
+    def to_dict(self) -> Dict:
+        return {'grade': self.grade, 'description': self.description, 'max_fold': self.max_fold}
+
+
+class PathwayInfo(NamedTuple):
+    pathway: str
+    emergency: bool
+    content: str
+
+    def to_dict(self) -> Dict:
+        return {'pathway': self.pathway, 'emergency': self.emergency, 'content': self.content}
+
+
+class Recommendation(NamedTuple):
+    title: str
+    description: str
+
+    def to_dict(self) -> Dict:
+        return {'title': self.title, 'description': self.description}
+
+
+# ── Diagnostic Pathway Content ──────────────────────────────────────
+_EMERGENCY_HTML = (
+    '<h4>Critical Care Pathway</h4>'
+    '<ul>'
+    '<li>Provide immediate hemodynamic support (ABC protocol, IV access, fluids)</li>'
+    '<li>Obtain blood cultures before antibiotics</li>'
+    '<li>Start empiric antibiotics if sepsis suspected</li>'
+    '<li>Urgent RUQ imaging (bedside ultrasound if available)</li>'
+    '<li>Consider ICU admission</li>'
+    '<li>Check acetaminophen level — consider N-acetylcysteine</li>'
+    '<li>Hepatology/GI emergent consultation</li>'
+    '</ul>'
+)
+
+_HEMOLYSIS_HTML = (
+    '<h4>Hemolysis Evaluation Pathway</h4>'
+    '<ul>'
+    '<li>CBC with differential and reticulocyte count</li>'
+    '<li>Peripheral blood smear review</li>'
+    '<li>LDH, haptoglobin, indirect bilirubin levels</li>'
+    '<li>Direct Coombs test (DAT)</li>'
+    '<li>Consider hematology consultation</li>'
+    '</ul>'
+)
+
+_ISOLATED_TMPL = (
+    '<h4>Isolated Hyperbilirubinemia Pathway</h4>'
+    '<p><strong>Key Question:</strong> Is this unconjugated or conjugated?</p>'
+    '<p>Indirect (unconjugated) bilirubin: ~{:.1f} mg/dL</p>'
+    '<ul>'
+    '<li>If predominantly indirect: Consider Gilbert syndrome (most common), hemolysis</li>'
+    '<li>If predominantly direct: Consider Dubin-Johnson syndrome, Rotor syndrome</li>'
+    '<li>Review medication history</li>'
+    '<li>Check CBC with reticulocyte count if hemolysis suspected</li>'
+    '</ul>'
+)
+
+_CHOLESTATIC_HTML = (
+    '<h4>Cholestatic Injury Pathway (R ≤ 2)</h4>'
+    '<p><strong>First step:</strong> RUQ Ultrasound</p>'
+    '<ul>'
+    '<li>If dilated ducts → Extrahepatic obstruction → MRCP/ERCP</li>'
+    '<li>If normal ducts → Intrahepatic cholestasis</li>'
+    '<li>&nbsp;&nbsp;→ Check AMA (for PBC), p-ANCA (for PSC)</li>'
+    '<li>&nbsp;&nbsp;→ Review medications</li>'
+    '<li>&nbsp;&nbsp;→ Consider MRCP if PSC suspected</li>'
+    '<li>Check GGT to confirm hepatic origin of elevated ALP</li>'
+    '</ul>'
+)
+
+_HEPATOCELLULAR_HTML = (
+    '<h4>Hepatocellular Injury Pathway (R ≥ 5)</h4>'
+    '<ul>'
+    '<li>Viral hepatitis serologies: HBsAg, anti-HBc IgM, anti-HCV, anti-HAV IgM</li>'
+    '<li>Acetaminophen level (if acute, ALT >1000)</li>'
+    '<li>Alcohol history and AST/ALT ratio assessment</li>'
+    '<li>Autoimmune markers: ANA, ASMA, IgG</li>'
+    '<li>Iron studies: ferritin, transferrin saturation</li>'
+    '<li>Ceruloplasmin (if age <40)</li>'
+    '<li>RUQ ultrasound for hepatic steatosis, masses</li>'
+    '<li>Medication and supplement review</li>'
+    '</ul>'
+)
+
+_MIXED_HTML = (
+    '<h4>Mixed Pattern Pathway (R 2-5)</h4>'
+    '<ul>'
+    '<li>Complete viral hepatitis panel (A, B, C, E)</li>'
+    '<li>Imaging: RUQ ultrasound, consider MRCP</li>'
+    '<li>Autoimmune markers: ANA, ASMA, AMA, IgG, IgM</li>'
+    '<li>Drug-induced liver injury assessment (RUCAM)</li>'
+    '<li>Consider overlap syndromes (AIH-PBC, AIH-PSC)</li>'
+    '<li>Liver biopsy may be needed for definitive diagnosis</li>'
+    '</ul>'
+)
+
+_FURTHER_HTML = (
+    '<h4>Further Evaluation Pathway</h4>'
+    '<ul>'
+    '<li>Repeat LFTs in 1-4 weeks if mild elevation and asymptomatic</li>'
+    '<li>Review lifestyle factors: alcohol, weight, medications</li>'
+    '<li>Consider non-invasive fibrosis assessment if persistent</li>'
+    '<li>Hepatology referral if unexplained persistent abnormalities</li>'
+    '</ul>'
+)
+
+# Pathway results that do not depend on lab values are built once.
+_PATHWAY_EMERGENCY = PathwayInfo('emergency', True, _EMERGENCY_HTML)
+_PATHWAY_HEMOLYSIS = PathwayInfo('hemolysis', False, _HEMOLYSIS_HTML)
+_PATHWAY_FURTHER = PathwayInfo('further_evaluation', False, _FURTHER_HTML)
+_PATHWAY_BY_PATTERN = {
+    _P_CHOL: PathwayInfo(_P_CHOL, False, _CHOLESTATIC_HTML),
+    _P_HEP: PathwayInfo(_P_HEP, False, _HEPATOCELLULAR_HTML),
+    _P_MIXED: PathwayInfo(_P_MIXED, False, _MIXED_HTML),
+}
 
-    if alp_uln == 0 or alp == 0:
-        return {'r_value': 0, 'alt_ratio': 0, 'alp_ratio': 0, 'alt_uln': alt_uln, 'alp_uln': alp_uln}
 
-    alt_ratio = alt / alt_uln
-    alp_ratio = alp / alp_uln
+def _lft_numeric_core(alt, ast, alp, alt_uln, ast_uln, alp_uln):
+    """Arithmetic shared by the R value and severity grading.
+
+    Returns (alt_ratio, alp_ratio, r_value, max_fold, grade_code) with
+    unrounded floats; grade_code indexes _SEVERITY_GRADES.
+    """
+    # ULNs come from _ULNS and are never zero; each fold is computed once
+    alt_fold = alt / alt_uln
+    ast_fold = ast / ast_uln
+    alp_fold = alp / alp_uln
 
-    if alp_ratio == 0:
-        r_value = 0
+    if alp == 0:
+        alt_ratio = 0.0
+        alp_ratio = 0.0
+        r_value = 0.0
     else:
-        r_value = alt_ratio / alp_ratio
+        alt_ratio = alt_fold
+        alp_ratio = alp_fold
+        r_value = alt_ratio / alp_ratio if alp_ratio != 0 else 0.0
+
+    # Running max over the folds, floored at 1.0x
+    max_fold = 1.0
+    if alt_fold > max_fold:
+        max_fold = alt_fold
+    if ast_fold > max_fold:
+        max_fold = ast_fold
+    if alp_fold > max_fold:
+        max_fold = alp_fold
+
+    if max_fold < 3:
+        grade_code = 0
+    elif max_fold < 10:
+        grade_code = 1
+    else:
+        grade_code = 2
+    return alt_ratio, alp_ratio, r_value, max_fold, grade_code
+
+
+_SEVERITY_GRADES = (
+    ('mild', '<3x ULN — Often monitored, evaluate for causes'),
+    ('moderate', '3-10x ULN — Requires systematic workup'),
+    ('severe', '>10x ULN — Urgent evaluation needed'),
+)
+
+
+_Q_SCALE = (1.0, 10.0, 100.0)
+
+
+def _q(x: float, d: int = 2) -> float:
+    """Round half-up to ``d`` decimals (d <= 2) for displayed ratios.
+
+    Non-finite values (inf/nan) are returned unchanged, as round() would.
+    """
+    if not isfinite(x):
+        return x
+    scale = _Q_SCALE[d]
+    return floor(x * scale + 0.5) / scale
+
+
+def _r_calc_result(alt, alp, alt_uln, alp_uln, alt_ratio, alp_ratio, r_value) -> RCalc:
+    if alp_uln == 0 or alp == 0:
+        return RCalc(0, 0, 0, alt_uln, alp_uln)
+    return RCalc(_q(r_value), _q(alt_ratio), _q(alp_ratio), alt_uln, alp_uln, alt, alp)
 
-    return {
-        'r_value': round(r_value, 2),
-        'alt_ratio': round(alt_ratio, 2),
-        'alp_ratio': round(alp_ratio, 2),
-        'alt_uln': alt_uln,
-        'alp_uln': alp_uln,
-        'alt': alt,
-        'alp': alp
-    }
+
+def calculate_r_value(alt: float, alp: float, sex: str = 'male') -> Dict:
+    """Calculate the R value for LFT pattern classification."""
+    ctx = _ctx_for(sex)
+    alt_ratio, alp_ratio, r_value, _, _ = _lft_numeric_core(
+        float(alt), 0.0, float(alp), ctx.alt_uln, ctx.ast_uln, ctx.alp_uln)
+    return _r_calc_result(alt, alp, ctx.alt_uln, ctx.alp_uln, alt_ratio, alp_ratio, r_value).to_dict()
 
 
 def determine_lft_pattern(r_value: float, alt: float, ast: float, alp: float,
@@ -214,200 +499,96 @@ def determine_lft_pattern(r_value: float, alt: float, ast: float, alp: float,
 
     # Isolated hyperbilirubinemia: normal enzymes, elevated bilirubin
     if alt <= alt_uln and ast <= ast_uln and alp <= alp_uln and total_bili > 1.0:
-        return 'isolated_hyperbilirubinemia'
+        return _P_ISOLATED
 
     if r_value >= 5:
-        return 'hepatocellular'
+        return _P_HEP
     elif r_value <= 2:
-        return 'cholestatic'
+        return _P_CHOL
     else:
-        return 'mixed'
+        return _P_MIXED
 
 
 def determine_severity(labs: Dict, sex: str = 'male') -> Dict:
     """Determine the severity of liver injury."""
-    alt_uln = 33 if sex == 'male' else 25
-    ast_uln = 40 if sex == 'male' else 32
-    alp_uln = 120
+    return _severity_cached(labs.get('alt', 0), labs.get('ast', 0), labs.get('alp', 0), sex).to_dict()
 
-    elevations = []
-    if labs.get('alt', 0) > alt_uln:
-        elevations.append(labs['alt'] / alt_uln)
-    if labs.get('ast', 0) > ast_uln:
-        elevations.append(labs['ast'] / ast_uln)
-    if labs.get('alp', 0) > alp_uln:
-        elevations.append(labs['alp'] / alp_uln)
 
-    max_elevation = max(elevations) if elevations else 1.0
+@lru_cache(maxsize=4096)
+def _severity_cached(alt: float, ast: float, alp: float, sex: str) -> Severity:
+    ctx = _ctx_for(sex)
+    _, _, _, max_fold, grade_code = _lft_numeric_core(
+        float(alt), float(ast), float(alp), ctx.alt_uln, ctx.ast_uln, ctx.alp_uln)
+    return Severity(*_SEVERITY_GRADES[grade_code], _q(max_fold, 1))
 
-    if max_elevation < 3:
-        return {'grade': 'mild', 'description': '<3x ULN — Often monitored, evaluate for causes', 'max_fold': round(max_elevation, 1)}
-    elif max_elevation < 10:
-        return {'grade': 'moderate', 'description': '3-10x ULN — Requires systematic workup', 'max_fold': round(max_elevation, 1)}
-    else:
-        return {'grade': 'severe', 'description': '>10x ULN — Urgent evaluation needed', 'max_fold': round(max_elevation, 1)}
+
+# Clinical red flags packed into one int: shock << 2 | acute_injury << 1 | hemolysis.
+_FLAG_SHOCK = 0b100
+_FLAG_ACUTE_INJURY = 0b010
+_FLAG_HEMOLYSIS = 0b001
+_FLAGS_EMERGENCY = _FLAG_SHOCK | _FLAG_ACUTE_INJURY
+
+
+def _clinical_flags(clinical: Dict) -> int:
+    return ((clinical.get('shock') == _YES) << 2
+            | (clinical.get('acute_injury') == _YES) << 1
+            | (clinical.get('hemolysis') == _YES))
 
 
 def determine_pathway(clinical: Dict, pattern: str, labs: Dict) -> Dict:
     """Determine the diagnostic pathway based on clinical and lab data."""
-    shock = clinical.get('shock', 'no')
-    acute_injury = clinical.get('acute_injury', 'no')
-    hemolysis_flag = clinical.get('hemolysis', 'no')
-
-    if shock == 'yes' or acute_injury == 'yes':
-        return {
-            'pathway': 'emergency',
-            'emergency': True,
-            'content': (
-                '<h4>Critical Care Pathway</h4>'
-                '<ul>'
-                '<li>Provide immediate hemodynamic support (ABC protocol, IV access, fluids)</li>'
-                '<li>Obtain blood cultures before antibiotics</li>'
-                '<li>Start empiric antibiotics if sepsis suspected</li>'
-                '<li>Urgent RUQ imaging (bedside ultrasound if available)</li>'
-                '<li>Consider ICU admission</li>'
-                '<li>Check acetaminophen level — consider N-acetylcysteine</li>'
-                '<li>Hepatology/GI emergent consultation</li>'
-                '</ul>'
-            )
-        }
+    return _pathway(_clinical_flags(clinical), pattern, labs).to_dict()
 
-    if hemolysis_flag == 'yes':
-        return {
-            'pathway': 'hemolysis',
-            'emergency': False,
-            'content': (
-                '<h4>Hemolysis Evaluation Pathway</h4>'
-                '<ul>'
-                '<li>CBC with differential and reticulocyte count</li>'
-                '<li>Peripheral blood smear review</li>'
-                '<li>LDH, haptoglobin, indirect bilirubin levels</li>'
-                '<li>Direct Coombs test (DAT)</li>'
-                '<li>Consider hematology consultation</li>'
-                '</ul>'
-            )
-        }
 
-    if pattern == 'isolated_hyperbilirubinemia':
-        indirect_bili = labs.get('total_bili', 0) - labs.get('direct_bili', 0)
-        return {
-            'pathway': 'isolated_bilirubin',
-            'emergency': False,
-            'content': (
-                f'<h4>Isolated Hyperbilirubinemia Pathway</h4>'
-                f'<p><strong>Key Question:</strong> Is this unconjugated or conjugated?</p>'
-                f'<p>Indirect (unconjugated) bilirubin: ~{indirect_bili:.1f} mg/dL</p>'
-                f'<ul>'
-                f'<li>If predominantly indirect: Consider Gilbert syndrome (most common), hemolysis</li>'
-                f'<li>If predominantly direct: Consider Dubin-Johnson syndrome, Rotor syndrome</li>'
-                f'<li>Review medication history</li>'
-                f'<li>Check CBC with reticulocyte count if hemolysis suspected</li>'
-                f'</ul>'
-            )
-        }
+def _pathway(flags: int, pattern: str, labs: Dict) -> PathwayInfo:
+    if flags & _FLAGS_EMERGENCY:
+        return _PATHWAY_EMERGENCY
 
-    if pattern == 'cholestatic':
-        return {
-            'pathway': 'cholestatic',
-            'emergency': False,
-            'content': (
-                '<h4>Cholestatic Injury Pathway (R ≤ 2)</h4>'
-                '<p><strong>First step:</strong> RUQ Ultrasound</p>'
-                '<ul>'
-                '<li>If dilated ducts → Extrahepatic obstruction → MRCP/ERCP</li>'
-                '<li>If normal ducts → Intrahepatic cholestasis</li>'
-                '<li>&nbsp;&nbsp;→ Check AMA (for PBC), p-ANCA (for PSC)</li>'
-                '<li>&nbsp;&nbsp;→ Review medications</li>'
-                '<li>&nbsp;&nbsp;→ Consider MRCP if PSC suspected</li>'
-                '<li>Check GGT to confirm hepatic origin of elevated ALP</li>'
-                '</ul>'
-            )
-        }
+    if flags & _FLAG_HEMOLYSIS:
+        return _PATHWAY_HEMOLYSIS
 
-    if pattern == 'hepatocellular':
-        return {
-            'pathway': 'hepatocellular',
-            'emergency': False,
-            'content': (
-                '<h4>Hepatocellular Injury Pathway (R ≥ 5)</h4>'
-                '<ul>'
-                '<li>Viral hepatitis serologies: HBsAg, anti-HBc IgM, anti-HCV, anti-HAV IgM</li>'
-                '<li>Acetaminophen level (if acute, ALT >1000)</li>'
-                '<li>Alcohol history and AST/ALT ratio assessment</li>'
-                '<li>Autoimmune markers: ANA, ASMA, IgG</li>'
-                '<li>Iron studies: ferritin, transferrin saturation</li>'
-                '<li>Ceruloplasmin (if age <40)</li>'
-                '<li>RUQ ultrasound for hepatic steatosis, masses</li>'
-                '<li>Medication and supplement review</li>'
-                '</ul>'
-            )
-        }
+    if pattern == _P_ISOLATED:
+        indirect_bili = labs.get('total_bili', 0) - labs.get('direct_bili', 0)
+        return PathwayInfo('isolated_bilirubin', False, _ISOLATED_TMPL.format(indirect_bili))
 
-    if pattern == 'mixed':
-        return {
-            'pathway': 'mixed',
-            'emergency': False,
-            'content': (
-                '<h4>Mixed Pattern Pathway (R 2-5)</h4>'
-                '<ul>'
-                '<li>Complete viral hepatitis panel (A, B, C, E)</li>'
-                '<li>Imaging: RUQ ultrasound, consider MRCP</li>'
-                '<li>Autoimmune markers: ANA, ASMA, AMA, IgG, IgM</li>'
-                '<li>Drug-induced liver injury assessment (RUCAM)</li>'
-                '<li>Consider overlap syndromes (AIH-PBC, AIH-PSC)</li>'
-                '<li>Liver biopsy may be needed for definitive diagnosis</li>'
-                '</ul>'
-            )
-        }
-
-    return {
-        'pathway': 'further_evaluation',
-        'emergency': False,
-        'content': (
-            '<h4>Further Evaluation Pathway</h4>'
-            '<ul>'
-            '<li>Repeat LFTs in 1-4 weeks if mild elevation and asymptomatic</li>'
-            '<li>Review lifestyle factors: alcohol, weight, medications</li>'
-            '<li>Consider non-invasive fibrosis assessment if persistent</li>'
-            '<li>Hepatology referral if unexplained persistent abnormalities</li>'
-            '</ul>'
-        )
-    }
+    return _PATHWAY_BY_PATTERN.get(pattern, _PATHWAY_FURTHER)
 
 
 def get_abnormalities(labs: Dict, sex: str = 'male') -> Dict:
     """Determine which LFT parameters are abnormal."""
-    alt_uln = 33 if sex == 'male' else 25
-    ast_uln = 40 if sex == 'male' else 32
+    return _abnormalities(labs, _ctx_for(sex))
+
 
+def _abnormalities(labs: Dict, ctx: _Ctx) -> Dict:
     return {
-        'alt': labs.get('alt', 0) > alt_uln,
-        'ast': labs.get('ast', 0) > ast_uln,
-        'alp': labs.get('alp', 0) > 120,
-        'total_bili': labs.get('total_bili', 0) > 1.0,
-        'direct_bili': labs.get('direct_bili', 0) > 0.3,
+        'alt': labs.get('alt', 0) > ctx.alt_uln,
+        'ast': labs.get('ast', 0) > ctx.ast_uln,
+        'alp': labs.get('alp', 0) > ctx.alp_uln,
+        'total_bili': labs.get('total_bili', 0) > ctx.tbili_uln,
+        'direct_bili': labs.get('direct_bili', 0) > ctx.dbili_uln,
         'albumin': 0 < labs.get('albumin', 0) < 3.3,
-        'pt': labs.get('pt', 0) > 13 and labs.get('pt', 0) > 0,
-        'inr': labs.get('inr', 0) > 1.1 and labs.get('inr', 0) > 0,
+        'pt': labs.get('pt', 0) > 13,
+        'inr': labs.get('inr', 0) > 1.1,
     }
 
 
 def build_severity_table(labs: Dict, abnormalities: Dict, sex: str = 'male') -> List[Dict]:
     """Build severity assessment table rows."""
-    alt_uln = 33 if sex == 'male' else 25
-    ast_uln = 40 if sex == 'male' else 32
+    return _severity_table(labs, abnormalities, _ctx_for(sex))
+
 
+def _severity_table(labs: Dict, abnormalities: Dict, ctx: _Ctx) -> List[Dict]:
     rows = []
     params = [
-        ('ALT', labs.get('alt', 0), alt_uln, abnormalities.get('alt', False)),
-        ('AST', labs.get('ast', 0), ast_uln, abnormalities.get('ast', False)),
-        ('ALP', labs.get('alp', 0), 120, abnormalities.get('alp', False)),
-        ('Total Bilirubin', labs.get('total_bili', 0), 1.0, abnormalities.get('total_bili', False)),
-        ('Direct Bilirubin', labs.get('direct_bili', 0), 0.3, abnormalities.get('direct_bili', False)),
+        ('ALT', labs.get('alt', 0), ctx.alt_uln, abnormalities.get('alt', False)),
+        ('AST', labs.get('ast', 0), ctx.ast_uln, abnormalities.get('ast', False)),
+        ('ALP', labs.get('alp', 0), ctx.alp_uln, abnormalities.get('alp', False)),
+        ('Total Bilirubin', labs.get('total_bili', 0), ctx.tbili_uln, abnormalities.get('total_bili', False)),
+        ('Direct Bilirubin', labs.get('direct_bili', 0), ctx.dbili_uln, abnormalities.get('direct_bili', False)),
     ]
 
     for name, value, uln, is_abnormal in params:
-        fold = round(value / uln, 1) if uln > 0 and value > 0 else 0
+        fold = _q(value / uln, 1) if uln > 0 and value > 0 else 0
         rows.append({
             'Parameter': name,
             'Value': value,
@@ -418,45 +599,70 @@ def build_severity_table(labs: Dict, abnormalities: Dict, sex: str = 'male') ->
     return rows
 
 
+def _batch_ulns(values, sexes) -> Tuple[np.ndarray, np.ndarray]:
+    values = np.asarray(values, dtype=np.float64).reshape(-1, 5)
+    is_male = (np.asarray(sexes) == _MALE).reshape(-1, 1)
+    ulns = np.where(is_male, np.array(_ULNS[_MALE]), np.array(_ULNS[_FEMALE]))
+    return values, ulns
+
+
+def get_abnormalities_batch(values, sexes) -> np.ndarray:
+    """Vectorized get_abnormalities for the enzyme/bilirubin columns.
+
+    ``values`` is an (N, 5) array of [alt, ast, alp, total_bili, direct_bili]
+    and ``sexes`` a length-N sequence of sex strings. Returns an (N, 5)
+    boolean matrix.
+    """
+    values, ulns = _batch_ulns(values, sexes)
+    return values > ulns
+
+
+def build_severity_table_batch(values, sexes) -> Dict[str, np.ndarray]:
+    """Vectorized build_severity_table for cohort dashboards.
+
+    Takes the same inputs as get_abnormalities_batch and returns columnar
+    arrays: ``folds`` (N, 5) fold-of-ULN (0 where the value is not positive),
+    ``abnormal`` (N, 5) booleans, and ``max_fold`` (N,) — the largest
+    enzyme elevation as used for severity grading (1.0 when none).
+    Rounding for display is left to the caller.
+    """
+    values, ulns = _batch_ulns(values, sexes)
+    folds = np.where(values > 0, values / ulns, 0.0)
+    abnormal = values > ulns
+    max_fold = np.where(abnormal[:, :3], folds[:, :3], 1.0).max(axis=1)
+    return {'folds': folds, 'abnormal': abnormal, 'max_fold': max_fold}
+
+
+# Synthetic-function report lines, indexed 0 = abnormal, 1 = normal, 2 = missing.
+_ALB_TEMPLATES = (
+    '{v} g/dL — LOW (suggests chronic disease or significant hepatic impairment)',
+    '{v} g/dL — Normal',
+    'Not provided',
+)
+_PT_TEMPLATES = ('{v} sec — PROLONGED', '{v} sec — Normal', 'Not provided')
+_INR_TEMPLATES = ('{v} — ELEVATED (impaired synthesis)', '{v} — Normal', 'Not provided')
+
+
 def assess_synthetic_function(labs: Dict) -> Dict:
     """Assess liver synthetic function."""
-    result = {}
-    impaired = False
-
     albumin = labs.get('albumin', 0)
     pt = labs.get('pt', 0)
     inr = labs.get('inr', 0)
 
-    if albumin > 0:
-        if albumin < 3.3:
-            result['Albumin'] = f'{albumin} g/dL — LOW (suggests chronic disease or significant hepatic impairment)'
-            impaired = True
-        else:
-            result['Albumin'] = f'{albumin} g/dL — Normal'
-    else:
-        result['Albumin'] = 'Not provided'
-
-    if pt > 0:
-        if pt > 13:
-            result['PT'] = f'{pt} sec — PROLONGED'
-            impaired = True
-        else:
-            result['PT'] = f'{pt} sec — Normal'
-    else:
-        result['PT'] = 'Not provided'
-
-    if inr > 0:
-        if inr > 1.1:
-            result['INR'] = f'{inr} — ELEVATED (impaired synthesis)'
-            impaired = True
-        else:
-            result['INR'] = f'{inr} — Normal'
-    else:
-        result['INR'] = 'Not provided'
+    alb_idx = (0 if albumin < 3.3 else 1) if albumin > 0 else 2
+    pt_idx = (0 if pt > 13 else 1) if pt > 0 else 2
+    inr_idx = (0 if inr > 1.1 else 1) if inr > 0 else 2
 
+    result = {
+        'Albumin': _ALB_TEMPLATES[alb_idx].format(v=albumin),
+        'PT': _PT_TEMPLATES[pt_idx].format(v=pt),
+        'INR': _INR_TEMPLATES[inr_idx].format(v=inr),
+    }
+    impaired = alb_idx == 0 or pt_idx == 0 or inr_idx == 0
     return result, impaired
 
 
+@lru_cache(maxsize=1024)
 def get_ast_alt_interpretation(ratio: float) -> str:
     """Interpret the AST/ALT ratio."""
     if ratio > 2:
@@ -467,226 +673,264 @@ def get_ast_alt_interpretation(ratio: float) -> str:
         return f'{ratio:.2f}:1 — Typical of viral hepatitis, NAFLD, or other non-alcoholic hepatocellular injury'
 
 
-def get_lft_differential_diagnosis(pattern: str) -> List[Dict]:
-    """Get differential diagnosis list for a given LFT pattern."""
-    return LFT_DIFFERENTIALS.get(pattern, [])
+def get_lft_differential_diagnosis(pattern: str) -> Tuple[Differential, ...]:
+    """Get the (condition, discussion) differentials for a given LFT pattern.
+
+    The returned tuple is shared and immutable; no copy is needed.
+    """
+    return _DIFFERENTIALS_BY_PATTERN.get(pattern, ())
+
+
+# Recommendation blocks are static; build them once and copy per call.
+_RECS_EMERGENCY = (
+    Recommendation(
+        title='Immediate Stabilization',
+        description='ABC protocol, IV access, fluid resuscitation. Do NOT delay treatment for diagnostics.'
+    ),
+    Recommendation(
+        title='Urgent Diagnostics',
+        description='Blood cultures, CBC, CMP, coagulation profile, type & screen, acetaminophen level, '
+                    'toxicology screen. Bedside RUQ ultrasound.'
+    ),
+    Recommendation(
+        title='Empiric Therapy',
+        description='Broad-spectrum antibiotics if sepsis suspected. N-acetylcysteine if acetaminophen '
+                    'toxicity possible (consider even if level unknown).'
+    ),
+    Recommendation(
+        title='Specialist Consultation',
+        description='Urgent hepatology/GI consultation. Consider transfer to transplant center if acute liver failure.'
+    ),
+)
+
+_RECS_CONFIRM = (
+    Recommendation(
+        title='Confirm Abnormalities',
+        description='Repeat LFTs in 1-2 weeks to confirm persistence if new finding and patient is asymptomatic.'
+    ),
+)
+
+_RECS_PATTERN = {
+    _P_HEP: (
+        Recommendation(
+            title='Hepatocellular Workup',
+            description='HBsAg, anti-HBc IgM, anti-HCV, anti-HAV IgM. ANA, ASMA, IgG (autoimmune). '
+                        'Ferritin, TIBC (hemochromatosis). Ceruloplasmin if age <40 (Wilson). '
+                        'Acetaminophen level if acute and ALT >1000.'
+        ),
+        Recommendation(
+            title='Lifestyle Assessment',
+            description='Detailed alcohol history (AUDIT questionnaire). Medication and supplement review. '
+                        'BMI, waist circumference, metabolic syndrome evaluation. Consider FIB-4 score.'
+        ),
+    ),
+    _P_CHOL: (
+        Recommendation(
+            title='Imaging Priority',
+            description='RUQ ultrasound with Doppler as first-line. If ducts dilated → MRCP or ERCP. '
+                        'If normal ducts → AMA for PBC, p-ANCA for PSC, consider MRCP.'
+        ),
+        Recommendation(
+            title='Confirm Hepatic Origin',
+            description='GGT or 5\'-nucleotidase to confirm elevated ALP is of hepatic origin '
+                        '(vs. bone, placental, intestinal).'
+        ),
+    ),
+    _P_MIXED: (
+        Recommendation(
+            title='Comprehensive Evaluation',
+            description='Full viral panel (HAV, HBV, HCV, HEV). Autoimmune markers (ANA, ASMA, AMA, IgG, IgM). '
+                        'Iron studies, copper studies. Imaging (US + consider MRCP). RUCAM for drug assessment.'
+        ),
+    ),
+    _P_ISOLATED: (
+        Recommendation(
+            title='Fractionate Bilirubin',
+            description='Distinguish conjugated vs. unconjugated. If predominantly unconjugated and <3 mg/dL '
+                        'with normal CBC, likely Gilbert syndrome (no treatment needed).'
+        ),
+        Recommendation(
+            title='Hemolysis Workup (if indicated)',
+            description='CBC, reticulocyte count, peripheral smear, LDH, haptoglobin, direct Coombs test.'
+        ),
+    ),
+}
+
+_RECS_SYNTHETIC_CONCERN = (
+    Recommendation(
+        title='Synthetic Function Concern',
+        description='Impaired hepatic synthesis suggests advanced disease. Urgent hepatology referral. '
+                    'Evaluate for encephalopathy (asterixis, confusion). Consider MELD score calculation.'
+    ),
+)
+
+_RECS_FOLLOW_UP_CHRONIC = (
+    Recommendation(
+        title='Follow-up Plan',
+        description='Continue current management. Monitor every 3-6 months. Consider non-invasive fibrosis '
+                    'assessment (FibroScan, FIB-4).'
+    ),
+)
+
+_RECS_FOLLOW_UP_NEW = (
+    Recommendation(
+        title='Follow-up Plan',
+        description='Re-evaluate in 4-6 weeks. If persistent, proceed with full workup per pathway. '
+                    'If resolved, likely transient insult (viral, drug, etc.).'
+    ),
+)
 
 
 def generate_lft_recommendations(pathway_info: Dict, labs: Dict, clinical: Dict, pattern: str) -> List[Dict]:
     """Generate clinical recommendations based on the analysis."""
-    recs = []
-    is_chronic = clinical.get('reason', '') in ('known_disease', 'routine')
+    recs = _recommendations(pathway_info.get('emergency'), labs, clinical, pattern)
+    return [rec.to_dict() for rec in recs]
 
-    if pathway_info.get('emergency'):
-        recs.append({
-            'title': 'Immediate Stabilization',
-            'description': 'ABC protocol, IV access, fluid resuscitation. Do NOT delay treatment for diagnostics.'
-        })
-        recs.append({
-            'title': 'Urgent Diagnostics',
-            'description': 'Blood cultures, CBC, CMP, coagulation profile, type & screen, acetaminophen level, '
-                           'toxicology screen. Bedside RUQ ultrasound.'
-        })
-        recs.append({
-            'title': 'Empiric Therapy',
-            'description': 'Broad-spectrum antibiotics if sepsis suspected. N-acetylcysteine if acetaminophen '
-                           'toxicity possible (consider even if level unknown).'
-        })
-        recs.append({
-            'title': 'Specialist Consultation',
-            'description': 'Urgent hepatology/GI consultation. Consider transfer to transplant center if acute liver failure.'
-        })
-    else:
-        recs.append({
-            'title': 'Confirm Abnormalities',
-            'description': 'Repeat LFTs in 1-2 weeks to confirm persistence if new finding and patient is asymptomatic.'
-        })
 
-        if pattern == 'hepatocellular':
-            recs.append({
-                'title': 'Hepatocellular Workup',
-                'description': 'HBsAg, anti-HBc IgM, anti-HCV, anti-HAV IgM. ANA, ASMA, IgG (autoimmune). '
-                               'Ferritin, TIBC (hemochromatosis). Ceruloplasmin if age <40 (Wilson). '
-                               'Acetaminophen level if acute and ALT >1000.'
-            })
-            recs.append({
-                'title': 'Lifestyle Assessment',
-                'description': 'Detailed alcohol history (AUDIT questionnaire). Medication and supplement review. '
-                               'BMI, waist circumference, metabolic syndrome evaluation. Consider FIB-4 score.'
-            })
-        elif pattern == 'cholestatic':
-            recs.append({
-                'title': 'Imaging Priority',
-                'description': 'RUQ ultrasound with Doppler as first-line. If ducts dilated → MRCP or ERCP. '
-                               'If normal ducts → AMA for PBC, p-ANCA for PSC, consider MRCP.'
-            })
-            recs.append({
-                'title': 'Confirm Hepatic Origin',
-                'description': 'GGT or 5\'-nucleotidase to confirm elevated ALP is of hepatic origin '
-                               '(vs. bone, placental, intestinal).'
-            })
-        elif pattern == 'mixed':
-            recs.append({
-                'title': 'Comprehensive Evaluation',
-                'description': 'Full viral panel (HAV, HBV, HCV, HEV). Autoimmune markers (ANA, ASMA, AMA, IgG, IgM). '
-                               'Iron studies, copper studies. Imaging (US + consider MRCP). RUCAM for drug assessment.'
-            })
-        elif pattern == 'isolated_hyperbilirubinemia':
-            recs.append({
-                'title': 'Fractionate Bilirubin',
-                'description': 'Distinguish conjugated vs. unconjugated. If predominantly unconjugated and <3 mg/dL '
-                               'with normal CBC, likely Gilbert syndrome (no treatment needed).'
-            })
-            recs.append({
-                'title': 'Hemolysis Workup (if indicated)',
-                'description': 'CBC, reticulocyte count, peripheral smear, LDH, haptoglobin, direct Coombs test.'
-            })
-
-        inr = labs.get('inr', 0)
-        albumin = labs.get('albumin', 0)
-        if (inr > 1.5) or (0 < albumin < 2.5):
-            recs.append({
-                'title': 'Synthetic Function Concern',
-                'description': 'Impaired hepatic synthesis suggests advanced disease. Urgent hepatology referral. '
-                               'Evaluate for encephalopathy (asterixis, confusion). Consider MELD score calculation.'
-            })
-
-        recs.append({
-            'title': 'Follow-up Plan',
-            'description': (
-                'Continue current management. Monitor every 3-6 months. Consider non-invasive fibrosis '
-                'assessment (FibroScan, FIB-4).' if is_chronic else
-                'Re-evaluate in 4-6 weeks. If persistent, proceed with full workup per pathway. '
-                'If resolved, likely transient insult (viral, drug, etc.).'
-            )
-        })
+def _recommendations(emergency: bool, labs: Dict, clinical: Dict, pattern: str) -> List[Recommendation]:
+    if emergency:
+        return list(_RECS_EMERGENCY)
+
+    is_chronic = clinical.get('reason', '') in ('known_disease', 'routine')
+    recs = list(_RECS_CONFIRM)
+    recs.extend(_RECS_PATTERN.get(pattern, ()))
 
+    inr = labs.get('inr', 0)
+    albumin = labs.get('albumin', 0)
+    if (inr > 1.5) or (0 < albumin < 2.5):
+        recs.extend(_RECS_SYNTHETIC_CONCERN)
+
+    recs.extend(_RECS_FOLLOW_UP_CHRONIC if is_chronic else _RECS_FOLLOW_UP_NEW)
     return recs
 
 
+# Teaching points in display order; the blank line between blocks matches a
+# "\n".join over newline-terminated sections.
+_EDU_TEMPLATE = (
+    "### 💡 Teaching Point 1: Pattern Recognition\n\n"
+    "The **R value** (ratio of ALT fold-elevation to ALP fold-elevation) helps categorize liver injury:\n"
+    "- **R ≥ 5**: Hepatocellular\n"
+    "- **R 2-5**: Mixed\n"
+    "- **R ≤ 2**: Cholestatic\n\n"
+    "This patient's R value of **{r_value}** indicates a **{pattern}** pattern.\n"
+    "\n"
+    "### 💡 Teaching Point 2: Clinical Context Matters\n\n"
+    "{context}\n"
+    "\n"
+    "### 💡 Teaching Point 3: Biochemical vs. Functional Tests\n\n"
+    "**Biochemical markers** (ALT, AST, ALP, GGT) indicate **injury** — they tell us cells are being damaged.\n\n"
+    "**Functional markers** (albumin, PT/INR, bilirubin) indicate **capacity** — they tell us if the liver "
+    "can still do its job.\n\n"
+    "A patient can have markedly elevated ALT (severe injury) but normal albumin/INR (preserved function), "
+    "as in acute viral hepatitis. Conversely, a patient with cirrhosis may have near-normal ALT but severely "
+    "impaired synthetic function.\n"
+    "\n"
+    "### 💡 Teaching Point 4: AST/ALT Ratio (De Ritis Ratio)\n\n"
+    "- **AST/ALT > 2:1**: Strongly suggests alcoholic liver disease\n"
+    "- **AST/ALT > 1:1**: May indicate cirrhosis of any etiology\n"
+    "- **AST/ALT < 1:1**: Typical of NAFLD, viral hepatitis\n\n"
+    "This ratio works because ALT has a longer half-life and is more liver-specific, while AST is found "
+    "in multiple tissues. In alcoholic hepatitis, mitochondrial damage preferentially releases AST.\n"
+)
+
+_EDU_CONTEXT_EMERGENCY = ("This patient has hemodynamic instability or acute liver failure features, making "
+                          "this a medical emergency regardless of lab values. Stabilize first, test second.")
+_EDU_CONTEXT_HEMOLYSIS = ("Suspected hemolysis directs us toward a hematologic rather than hepatic evaluation. "
+                          "The elevated bilirubin is likely from RBC destruction, not liver disease.")
+_EDU_CONTEXT_ROUTINE = ("The absence of red flags allows for a systematic outpatient evaluation. "
+                        "Follow the pattern-based diagnostic algorithm.")
+
+# Indexed by _clinical_flags(): bit 0 is hemolysis, any higher bit is an
+# emergency flag, and emergency outranks hemolysis.
+_EDU_CONTEXT_BY_FLAGS = (_EDU_CONTEXT_ROUTINE, _EDU_CONTEXT_HEMOLYSIS) + (_EDU_CONTEXT_EMERGENCY,) * 6
+
+
 def generate_lft_educational_content(results: Dict, clinical: Dict) -> str:
     """Generate educational teaching points for LFT analysis."""
     pattern = results.get('pattern', '')
     r_value = results.get('r_value', 0)
 
-    content = []
-
-    # Teaching point 1: Pattern Recognition
-    content.append(
-        "### 💡 Teaching Point 1: Pattern Recognition\n\n"
-        f"The **R value** (ratio of ALT fold-elevation to ALP fold-elevation) helps categorize liver injury:\n"
-        f"- **R ≥ 5**: Hepatocellular\n"
-        f"- **R 2-5**: Mixed\n"
-        f"- **R ≤ 2**: Cholestatic\n\n"
-        f"This patient's R value of **{r_value}** indicates a **{pattern.replace('_', ' ')}** pattern.\n"
-    )
-
-    # Teaching point 2: Clinical Context
-    emergency_status = clinical.get('shock', 'no') == 'yes' or clinical.get('acute_injury', 'no') == 'yes'
-    hemolysis_status = clinical.get('hemolysis', 'no') == 'yes'
-
-    if emergency_status:
-        context_text = ("This patient has hemodynamic instability or acute liver failure features, making "
-                        "this a medical emergency regardless of lab values. Stabilize first, test second.")
-    elif hemolysis_status:
-        context_text = ("Suspected hemolysis directs us toward a hematologic rather than hepatic evaluation. "
-                        "The elevated bilirubin is likely from RBC destruction, not liver disease.")
-    else:
-        context_text = ("The absence of red flags allows for a systematic outpatient evaluation. "
-                        "Follow the pattern-based diagnostic algorithm.")
+    context_text = _EDU_CONTEXT_BY_FLAGS[_clinical_flags(clinical)]
+
+    return _EDU_TEMPLATE.format(r_value=r_value, pattern=pattern.replace('_', ' '), context=context_text)
+
 
-    content.append(
-        "### 💡 Teaching Point 2: Clinical Context Matters\n\n"
-        f"{context_text}\n"
-    )
-
-    # Teaching point 3: Synthetic vs Biochemical
-    content.append(
-        "### 💡 Teaching Point 3: Biochemical vs. Functional Tests\n\n"
-        "**Biochemical markers** (ALT, AST, ALP, GGT) indicate **injury** — they tell us cells are being damaged.\n\n"
-        "**Functional markers** (albumin, PT/INR, bilirubin) indicate **capacity** — they tell us if the liver "
-        "can still do its job.\n\n"
-        "A patient can have markedly elevated ALT (severe injury) but normal albumin/INR (preserved function), "
-        "as in acute viral hepatitis. Conversely, a patient with cirrhosis may have near-normal ALT but severely "
-        "impaired synthetic function.\n"
-    )
-
-    # Teaching point 4: AST/ALT Ratio
-    content.append(
-        "### 💡 Teaching Point 4: AST/ALT Ratio (De Ritis Ratio)\n\n"
-        "- **AST/ALT > 2:1**: Strongly suggests alcoholic liver disease\n"
-        "- **AST/ALT > 1:1**: May indicate cirrhosis of any etiology\n"
-        "- **AST/ALT < 1:1**: Typical of NAFLD, viral hepatitis\n\n"
-        "This ratio works because ALT has a longer half-life and is more liver-specific, while AST is found "
-        "in multiple tissues. In alcoholic hepatitis, mitochondrial damage preferentially releases AST.\n"
-    )
-
-    return "\n".join(content)
-
-
-def analyze_lft(labs: Dict, clinical: Dict) -> Dict:
-    """Perform comprehensive LFT analysis. Main entry point."""
-    sex = clinical.get('sex', 'male')
+def analyze_lft(labs: Dict, clinical: Dict, include_education: bool = True) -> Dict:
+    """Perform comprehensive LFT analysis. Main entry point.
+
+    Pass ``include_education=False`` to skip rendering the teaching points
+    (``educational_content`` is then empty), e.g. for batch or plotting use.
+    """
+    sex = clinical.get('sex', _MALE)
     alt = labs.get('alt', 0)
     ast = labs.get('ast', 0)
     alp = labs.get('alp', 0)
     total_bili = labs.get('total_bili', 0)
     direct_bili = labs.get('direct_bili', 0)
 
-    # R value calculation
-    r_calc = calculate_r_value(alt, alp, sex)
-    r_value = r_calc['r_value']
+    # R value and severity share one numeric pass
+    ctx = _ctx_for(sex)
+    alt_ratio, alp_ratio, r_raw, max_fold, grade_code = _lft_numeric_core(
+        float(alt), float(ast), float(alp), ctx.alt_uln, ctx.ast_uln, ctx.alp_uln)
+    r_calc = _r_calc_result(alt, alp, ctx.alt_uln, ctx.alp_uln, alt_ratio, alp_ratio, r_raw)
+    r_value = r_calc.r_value
 
-    # Pattern
+    # Pattern (thresholds apply to the rounded R value)
     pattern = determine_lft_pattern(r_value, alt, ast, alp, total_bili, direct_bili)
 
     # Abnormalities
-    abnormalities = get_abnormalities(labs, sex)
+    abnormalities = _abnormalities(labs, ctx)
 
     # Severity
-    severity = determine_severity(labs, sex)
+    severity = Severity(*_SEVERITY_GRADES[grade_code], _q(max_fold, 1))
 
     # Severity table
-    severity_table = build_severity_table(labs, abnormalities, sex)
+    severity_table = _severity_table(labs, abnormalities, ctx)
 
     # Pathway
-    pathway_info = determine_pathway(clinical, pattern, labs)
+    pathway_info = _pathway(_clinical_flags(clinical), pattern, labs)
 
     # Synthetic function
     synthetic, synthetic_impaired = assess_synthetic_function(labs)
 
     # AST/ALT ratio
-    ast_alt_ratio = round(ast / alt, 2) if alt > 0 else 0
+    ast_alt_ratio = _q(ast / alt) if alt > 0 else 0
     ast_alt_interpretation = get_ast_alt_interpretation(ast_alt_ratio)
 
     # Differentials
     differentials = get_lft_differential_diagnosis(pattern)
 
     # Recommendations
-    recommendations = generate_lft_recommendations(pathway_info, labs, clinical, pattern)
+    recommendations = _recommendations(pathway_info.emergency, labs, clinical, pattern)
 
     # Build results
     results = {
         'r_value': r_value,
-        'r_calculation': r_calc,
+        'r_calculation': r_calc.to_dict(),
         'pattern': pattern,
         'abnormalities': abnormalities,
-        'severity': severity,
+        'severity': severity.to_dict(),
         'severity_table': severity_table,
-        'pathway': pathway_info.get('pathway', ''),
-        'pathway_content': pathway_info.get('content', ''),
-        'emergency': pathway_info.get('emergency', False),
+        'pathway': pathway_info.pathway,
+        'pathway_content': pathway_info.content,
+        'emergency': pathway_info.emergency,
         'synthetic_function': synthetic,
         'synthetic_impaired': synthetic_impaired,
         'ast_alt_ratio': ast_alt_ratio,
         'ast_alt_interpretation': ast_alt_interpretation,
-        'differentials': differentials,
-        'recommendations': recommendations,
+        'differentials': [d._asdict() for d in differentials],
+        'recommendations': [rec.to_dict() for rec in recommendations],
         'labs': labs,
         'clinical': clinical,
     }
 
     # Educational content
-    results['educational_content'] = generate_lft_educational_content(results, clinical)
+    results['educational_content'] = (
+        generate_lft_educational_content(results, clinical) if include_education else '')
+
+    return results
+
 
-    return results
\ No newline at end of file
+def analyze_lft_json(labs: Dict, clinical: Dict, include_education: bool = True) -> bytes:
+    """Run analyze_lft and return the result as UTF-8 JSON bytes (orjson when installed)."""
+    return _json_dumps(analyze_lft(labs, clinical, include_education))
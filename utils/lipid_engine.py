@@ -2,9 +2,43 @@
 Lipid Profile Analysis Engine
 Standard + advanced lipid panel with cardiovascular risk assessment.
 """
-from typing import Dict
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, Tuple
 
-LIPID_REFERENCE_RANGES = {
+import numpy as np
+
+from utils.jit import njit, prange
+
+_TC = 'Total_Cholesterol'
+_HDL = 'HDL'
+_LDL = 'LDL'
+_TG = 'Triglycerides'
+
+_NEG_INF = float('-inf')
+_POS_INF = float('inf')
+
+
+def _frozen(obj):
+    """Recursively wrap dicts in read-only proxies and turn lists into tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _frozen(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_frozen(v) for v in obj)
+    return obj
+
+
+def _thawed(obj):
+    """Plain dict/list copy of a _frozen value, for results handed to callers (JSON, pickle, deepcopy)."""
+    if isinstance(obj, MappingProxyType):
+        return {k: _thawed(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_thawed(v) for v in obj]
+    return obj
+
+
+# Static tables are read-only (MappingProxyType / tuples) and safe to share.
+LIPID_REFERENCE_RANGES = _frozen({
     'Total_Cholesterol': {'Default': {'low': 0, 'high': 200, 'unit': 'mg/dL', 'critical_low': 0, 'critical_high': 500}},
     'HDL': {
         'Male': {'low': 40, 'high': 60, 'unit': 'mg/dL', 'critical_low': 10, 'critical_high': 120},
@@ -20,9 +54,9 @@ LIPID_REFERENCE_RANGES = {
     'ApoA1': {'Default': {'low': 120, 'high': 180, 'unit': 'mg/dL', 'critical_low': 50, 'critical_high': 250}},
     'ApoB': {'Default': {'low': 40, 'high': 100, 'unit': 'mg/dL', 'critical_low': 20, 'critical_high': 250}},
     'Lp_a': {'Default': {'low': 0, 'high': 75, 'unit': 'nmol/L', 'critical_low': 0, 'critical_high': 500}},
-}
+})
 
-LIPID_DIFFERENTIALS = {
+LIPID_DIFFERENTIALS = _frozen({
     'Total_Cholesterol': {
         'high': {'title': 'Hypercholesterolemia', 'differentials': [
             {'condition': 'Primary/Familial Hypercholesterolemia', 'discussion': 'Genetic disorder of LDL receptor. FH heterozygous: TC 300-500. FH homozygous: TC >500. Tendon xanthomas, premature ASCVD.'},
@@ -61,7 +95,7 @@ LIPID_DIFFERENTIALS = {
             {'condition': 'Genetic (Primary)', 'discussion': 'Lp(a) levels are >90% genetically determined. Independent ASCVD risk factor. >50 mg/dL (>125 nmol/L) = high risk. Not significantly modifiable by lifestyle. PCSK9 inhibitors reduce by ~25%.'},
         ]}
     }
-}
+})
 
 
 def _get_ref(param, sex='Default'):
@@ -71,57 +105,224 @@ def _get_ref(param, sex='Default'):
     return {}
 
 
+# (param, sex) -> (low, high, critical_low, critical_high, unit), flattened
+# once so _classify does a single lookup and tuple unpack per parameter.
+_LIPID_REF_FLAT = {
+    (param, sex): (ref.get('low', 0), ref.get('high', _POS_INF),
+                   ref.get('critical_low', _NEG_INF), ref.get('critical_high', _POS_INF),
+                   ref.get('unit', ''))
+    for param, refs in LIPID_REFERENCE_RANGES.items()
+    for sex, ref in refs.items()
+}
+
+
 def _classify(param, value, sex='Default'):
-    ref = _get_ref(param, sex)
-    if not ref:
+    ref = _LIPID_REF_FLAT.get((param, sex)) or _LIPID_REF_FLAT.get((param, 'Default'))
+    if ref is None:
         return {'status': 'unknown', 'message': 'No reference', 'color': 'gray'}
-    r = {'value': value, 'unit': ref.get('unit', ''), 'low': ref.get('low'), 'high': ref.get('high'),
-         'critical_low': ref.get('critical_low'), 'critical_high': ref.get('critical_high')}
-    if value < ref.get('critical_low', float('-inf')):
+    low, high, critical_low, critical_high, unit = ref
+    r = {'value': value, 'unit': unit, 'low': low, 'high': high,
+         'critical_low': critical_low, 'critical_high': critical_high}
+    if value < critical_low:
         r.update({'status': 'critical_low', 'message': f'CRITICAL LOW: {value}', 'color': 'red'})
-    elif value > ref.get('critical_high', float('inf')):
+    elif value > critical_high:
         r.update({'status': 'critical_high', 'message': f'CRITICAL HIGH: {value}', 'color': 'red'})
-    elif value > ref.get('high', float('inf')):
-        r.update({'status': 'high', 'message': f'HIGH: {value} (Ref: ≤{ref["high"]})', 'color': 'orange'})
-    elif value < ref.get('low', 0) and ref.get('low', 0) > 0:
-        r.update({'status': 'low', 'message': f'LOW: {value} (Ref: ≥{ref["low"]})', 'color': 'orange'})
+    elif value > high:
+        r.update({'status': 'high', 'message': f'HIGH: {value} (Ref: ≤{high})', 'color': 'orange'})
+    elif value < low and low > 0:
+        r.update({'status': 'low', 'message': f'LOW: {value} (Ref: ≥{low})', 'color': 'orange'})
     else:
         r.update({'status': 'normal', 'message': f'NORMAL: {value}', 'color': 'green'})
     return r
 
 
-def analyze_lipid(parameters: Dict, sex: str = 'Default') -> Dict:
+# ── Columnar reference store ────────────────────────────────────────
+# Per-sex (low, high, critical_low, critical_high) vectors aligned with
+# LIPID_PARAMS, for classifying many records without per-value dict lookups.
+LIPID_PARAMS = tuple(LIPID_REFERENCE_RANGES)
+
+
+def _build_threshold_arrays(sex: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    refs = [_LIPID_REF_FLAT.get((param, sex)) or _LIPID_REF_FLAT[(param, 'Default')] for param in LIPID_PARAMS]
+    return tuple(np.array([ref[i] for ref in refs], dtype=np.float64) for i in range(4))
+
+
+LIPID_THRESHOLDS = {sex: _build_threshold_arrays(sex) for sex in ('Default', 'Male', 'Female')}
+
+
+def get_lipid_thresholds(sex: str = 'Default') -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return the (low, high, critical_low, critical_high) vectors for a sex, aligned with LIPID_PARAMS."""
+    return LIPID_THRESHOLDS.get(sex, LIPID_THRESHOLDS['Default'])
+
+
+# Status codes emitted by the batch classifier (same precedence as _classify).
+LIPID_STATUS_BY_CODE = {
+    -2: 'critical_low', -1: 'low', 0: 'normal', 1: 'high', 2: 'critical_high', 3: 'unknown',
+}
+
+
+@njit(cache=True, parallel=True)
+def _classify_kernel(values, low, high, clow, chigh, out_status):
+    n_rows, n_cols = values.shape
+    for i in prange(n_rows):
+        for j in range(n_cols):
+            v = values[i, j]
+            if v != v:  # NaN marks a missing result
+                out_status[i, j] = 3
+            elif v < clow[j]:
+                out_status[i, j] = -2
+            elif v > chigh[j]:
+                out_status[i, j] = 2
+            elif v > high[j]:
+                out_status[i, j] = 1
+            elif v < low[j] and low[j] > 0:
+                out_status[i, j] = -1
+            else:
+                out_status[i, j] = 0
+
+
+def classify_lipid_batch(values, sex: str = 'Default') -> np.ndarray:
+    """Classify many lipid records in one call.
+
+    ``values`` is an (N, len(LIPID_PARAMS)) matrix (or a single row) in
+    LIPID_PARAMS column order, with NaN for missing results. Returns an int8
+    matrix of status codes; see LIPID_STATUS_BY_CODE. Single-patient
+    analysis keeps using _classify.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values.reshape(1, -1)
+    out = np.empty(values.shape, dtype=np.int8)
+    _classify_kernel(values, *get_lipid_thresholds(sex), out)
+    return out
+
+
+def lipid_indices_batch(tc, hdl, tg) -> Dict[str, np.ndarray]:
+    """Vectorized calculated indices for N patients.
+
+    ``tc``, ``hdl`` and ``tg`` are length-N arrays with NaN for missing
+    results. Returns unrounded TC/HDL ratio, non-HDL and Friedewald LDL, NaN
+    wherever ``analyze_lipid`` would omit the index, plus a boolean
+    pancreatitis-risk flag (TG >= 500).
+    """
+    tc, hdl, tg = (np.asarray(a, dtype=np.float64) for a in (tc, hdl, tg))
+    have_tc_hdl = (tc != 0) & (hdl != 0) & ~np.isnan(tc) & ~np.isnan(hdl)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tc_hdl_ratio = np.where(have_tc_hdl & (hdl > 0), tc / hdl, np.nan)
+    non_hdl = np.where(have_tc_hdl, tc - hdl, np.nan)
+    friedewald_ldl = np.where(have_tc_hdl & (tg != 0) & (tg < 400), tc - hdl - tg / 5, np.nan)
+    return {
+        'tc_hdl_ratio': tc_hdl_ratio,
+        'non_hdl': non_hdl,
+        'friedewald_ldl': friedewald_ldl,
+        'pancreatitis_risk': tg >= 500,
+    }
+
+
+def analyze_lipid_batch(parameters_soa: Dict[str, np.ndarray], sex_arr=None) -> Dict[str, np.ndarray]:
+    """Columnar lipid analysis for N patients.
+
+    ``parameters_soa`` maps parameter names (LIPID_PARAMS) to length-N arrays,
+    NaN for missing results; absent parameters count as missing. ``sex_arr``
+    holds 'Male'/'Female'/'Default' per patient, anything else falling back
+    to Default, as in analyze_lipid. Returns the (N, len(LIPID_PARAMS)) int8
+    ``statuses`` matrix (see LIPID_STATUS_BY_CODE), per-patient abnormal and
+    critical counts, and the lipid_indices_batch columns.
+    """
+    cols = {p: np.asarray(v, dtype=np.float64) for p, v in parameters_soa.items() if p in LIPID_REFERENCE_RANGES}
+    n = len(next(iter(cols.values()))) if cols else len(sex_arr if sex_arr is not None else ())
+    values = np.full((n, len(LIPID_PARAMS)), np.nan)
+    for j, param in enumerate(LIPID_PARAMS):
+        if param in cols:
+            values[:, j] = cols[param]
+
+    # Rows are grouped by sex and each group goes through the njit classifier.
+    statuses = np.empty(values.shape, dtype=np.int8)
+    if sex_arr is None:
+        statuses[:] = classify_lipid_batch(values)
+    else:
+        sex_arr = np.asarray(sex_arr)
+        is_male = sex_arr == 'Male'
+        is_female = sex_arr == 'Female'
+        for sex, rows in (('Male', is_male), ('Female', is_female), ('Default', ~(is_male | is_female))):
+            if rows.any():
+                statuses[rows] = classify_lipid_batch(values[rows], sex)
+
+    return {
+        'parameters': LIPID_PARAMS,
+        'statuses': statuses,
+        'abnormal_count': ((statuses != 0) & (statuses != 3)).sum(axis=1),
+        'critical_count': (np.abs(statuses) == 2).sum(axis=1),
+        **lipid_indices_batch(values[:, LIPID_PARAMS.index(_TC)],
+                              values[:, LIPID_PARAMS.index(_HDL)],
+                              values[:, LIPID_PARAMS.index(_TG)]),
+    }
+
+
+# LDL goal ladder: _LDL_GOALS[i] applies below _LDL_CUTS[i], the last entry at or above 190.
+_LDL_CUTS = (70, 100, 130, 160, 190)
+_LDL_GOALS = (
+    'At optimal level for very high-risk patients',
+    'Optimal for high-risk; above goal for very high-risk',
+    'Near/above optimal; above goal for most patients with risk factors',
+    'Borderline high',
+    'High',
+    'Very high — consider familial hypercholesterolemia screening',
+)
+
+
+# Per-parameter teaching notes attached to each result row.
+_LIPID_LEARNING = {
+    'Total_Cholesterol': 'Desirable <200, Borderline 200-239, High ≥240 mg/dL. Sum of HDL + LDL + VLDL.',
+    'LDL': 'Primary target for therapy. Goals vary by risk: <70 very high risk, <100 high risk, <130 moderate, <160 low risk. Friedewald: LDL = TC - HDL - (TG/5) if TG<400.',
+    'HDL': 'Protective factor. <40 (men) or <50 (women) is low. >60 is protective. Exercise, moderate alcohol, and niacin raise HDL.',
+    'Triglycerides': 'Normal <150, Borderline 150-199, High 200-499, Very High ≥500 (pancreatitis risk). Fasting sample required for accuracy.',
+}
+
+# (parameter, direction) -> differential, flattened from LIPID_DIFFERENTIALS.
+_LIPID_DIFF_FLAT = {(p, d): v for p, sub in LIPID_DIFFERENTIALS.items() for d, v in sub.items()}
+
+
+_LIPID_EDU = """### 🎓 Lipid Profile Learning Points
+
+**1. LDL is the Primary Target**: ACC/AHA guidelines focus on statin intensity based on 10-year ASCVD risk rather than specific LDL targets, though LDL goals are still used clinically.
+
+**2. Non-HDL is Often Better than LDL**: Non-HDL cholesterol (TC minus HDL) captures all atherogenic particles including VLDL and IDL. It's the secondary target when TG is elevated.
+
+**3. Friedewald Equation Limitations**: LDL = TC - HDL - TG/5 is inaccurate when TG >400 or in non-fasting samples. Martin-Hopkins equation is more accurate at low LDL and high TG.
+
+**4. Lp(a) is Genetically Determined**: Levels >50 mg/dL (>125 nmol/L) are an independent risk factor for ASCVD. Screen once in lifetime. Not significantly modifiable by lifestyle. PCSK9 inhibitors reduce ~25%.
+
+**5. Triglycerides and Pancreatitis**: TG ≥500 carries pancreatitis risk. Immediate treatment: dietary fat restriction, fibrates. TG >1000: very high risk — consider LPL deficiency.
+"""
+
+
+def analyze_lipid(parameters: Dict, sex: str = 'Default', include_education: bool = True) -> Dict:
     results, abnormalities, critical_values, calc_indices = {}, [], [], {}
 
     for pname, pdata in parameters.items():
         val = pdata.get('value')
-        if val is None or not isinstance(val, (int, float)):
+        if val is None:
+            continue
+        try:
+            val = float(val)  # also accepts numeric strings and numpy scalars
+        except (TypeError, ValueError):
             continue
         c = _classify(pname, val, sex)
         diff = None
         if c['status'] not in ('normal', 'unknown'):
             d = c['status'].replace('critical_', '')
-            if pname in LIPID_DIFFERENTIALS and d in LIPID_DIFFERENTIALS[pname]:
-                diff = LIPID_DIFFERENTIALS[pname][d]
+            diff = _thawed(_LIPID_DIFF_FLAT.get((pname, d)))
             abnormalities.append({'parameter': pname, 'classification': c, 'differential': diff})
             if 'critical' in c['status']:
                 critical_values.append({'parameter': pname, 'value': val, 'status': c['status'], 'message': c['message']})
-        
-        learning = {
-            'Total_Cholesterol': 'Desirable <200, Borderline 200-239, High ≥240 mg/dL. Sum of HDL + LDL + VLDL.',
-            'LDL': 'Primary target for therapy. Goals vary by risk: <70 very high risk, <100 high risk, <130 moderate, <160 low risk. Friedewald: LDL = TC - HDL - (TG/5) if TG<400.',
-            'HDL': 'Protective factor. <40 (men) or <50 (women) is low. >60 is protective. Exercise, moderate alcohol, and niacin raise HDL.',
-            'Triglycerides': 'Normal <150, Borderline 150-199, High 200-499, Very High ≥500 (pancreatitis risk). Fasting sample required for accuracy.',
-        }.get(pname)
-        
+
+        learning = _LIPID_LEARNING.get(pname)
         results[pname] = {'value': val, 'unit': pdata.get('unit', c.get('unit', '')),
                           'classification': c, 'differential': diff, 'learning': learning}
 
-    # Calculated indices
-    tc = parameters.get('Total_Cholesterol', {}).get('value')
-    hdl = parameters.get('HDL', {}).get('value')
-    ldl = parameters.get('LDL', {}).get('value')
-    tg = parameters.get('Triglycerides', {}).get('value')
+    # Calculated indices, from the coerced values above
+    tc, hdl, ldl, tg = (results[k]['value'] if k in results else None for k in (_TC, _HDL, _LDL, _TG))
 
     if tc and hdl and hdl > 0:
         ratio = round(tc / hdl, 1)
@@ -157,35 +358,20 @@ def analyze_lipid(parameters: Dict, sex: str = 'Default') -> Dict:
     # LDL classification
     ldl_goals = []
     if ldl:
-        if ldl < 70: ldl_goals.append('At optimal level for very high-risk patients')
-        elif ldl < 100: ldl_goals.append('Optimal for high-risk; above goal for very high-risk')
-        elif ldl < 130: ldl_goals.append('Near/above optimal; above goal for most patients with risk factors')
-        elif ldl < 160: ldl_goals.append('Borderline high')
-        elif ldl < 190: ldl_goals.append('High')
-        else: ldl_goals.append('Very high — consider familial hypercholesterolemia screening')
-
-    pattern_summary = '\n\n'.join([
-        f'**LDL Assessment**: {"; ".join(ldl_goals)}' if ldl_goals else '',
-        f'**Triglyceride Assessment**: {"Normal" if not tg or tg < 150 else "Borderline (150-199)" if tg < 200 else "High (200-499)" if tg < 500 else "VERY HIGH (≥500) — PANCREATITIS RISK"}' if tg else '',
-    ])
+        ldl_goals.append(_LDL_GOALS[bisect_right(_LDL_CUTS, ldl)])
 
-    edu = """### 🎓 Lipid Profile Learning Points
-
-**1. LDL is the Primary Target**: ACC/AHA guidelines focus on statin intensity based on 10-year ASCVD risk rather than specific LDL targets, though LDL goals are still used clinically.
-
-**2. Non-HDL is Often Better than LDL**: Non-HDL cholesterol (TC minus HDL) captures all atherogenic particles including VLDL and IDL. It's the secondary target when TG is elevated.
-
-**3. Friedewald Equation Limitations**: LDL = TC - HDL - TG/5 is inaccurate when TG >400 or in non-fasting samples. Martin-Hopkins equation is more accurate at low LDL and high TG.
-
-**4. Lp(a) is Genetically Determined**: Levels >50 mg/dL (>125 nmol/L) are an independent risk factor for ASCVD. Screen once in lifetime. Not significantly modifiable by lifestyle. PCSK9 inhibitors reduce ~25%.
-
-**5. Triglycerides and Pancreatitis**: TG ≥500 carries pancreatitis risk. Immediate treatment: dietary fat restriction, fibrates. TG >1000: very high risk — consider LPL deficiency.
-"""
+    # Narrative text is skipped for numeric-only callers (include_education=False)
+    pattern_summary = ''
+    if include_education:
+        pattern_summary = '\n\n'.join([
+            f'**LDL Assessment**: {"; ".join(ldl_goals)}' if ldl_goals else '',
+            f'**Triglyceride Assessment**: {"Normal" if not tg or tg < 150 else "Borderline (150-199)" if tg < 200 else "High (200-499)" if tg < 500 else "VERY HIGH (≥500) — PANCREATITIS RISK"}' if tg else '',
+        ])
 
     return {
         'parameters': results, 'abnormalities': abnormalities, 'critical_values': critical_values,
         'quality_checks': [], 'calculated_indices': calc_indices,
         'total_parameters': len(results), 'abnormal_count': len(abnormalities),
         'critical_count': len(critical_values), 'pattern_summary': pattern_summary,
-        'educational_content': edu, 'recommendations': []
+        'educational_content': _LIPID_EDU if include_education else '', 'recommendations': []
     }
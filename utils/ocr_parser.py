@@ -13,16 +13,29 @@ Functions:
 
 import re
 import io
+import os
+import copy
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+try:
+    from utils.config import OCR_CACHE_SIZE, OCR_SINGLE_THREAD_TESSERACT
+except ImportError:
+    from config import OCR_CACHE_SIZE, OCR_SINGLE_THREAD_TESSERACT
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Parameter aliases — maps common lab-report labels to canonical keys used
-# by the analysis engine (keys of REFERENCE_RANGES).
+# by the analysis engine (keys of REFERENCE_RANGES). Read-only: the match
+# table below is derived from it once at import.
 # ---------------------------------------------------------------------------
-PARAMETER_ALIASES: Dict[str, str] = {
+PARAMETER_ALIASES: Mapping[str, str] = MappingProxyType({
     # CBC
     "rbc": "RBC", "rbc count": "RBC", "red blood cell": "RBC",
     "red blood cell count": "RBC", "red blood cells": "RBC",
@@ -213,7 +226,7 @@ PARAMETER_ALIASES: Dict[str, str] = {
     "specific gravity": "Urine_Specific_Gravity",
     "urine pus cells": "Urine_Pus_Cells", "pus cells": "Urine_Pus_Cells",
     "urine rbc": "Urine_RBC",
-}
+})
 
 # Build a sorted list for regex matching (longer aliases first to avoid partial matches)
 _SORTED_ALIASES = sorted(PARAMETER_ALIASES.keys(), key=len, reverse=True)
@@ -262,8 +275,37 @@ def preprocess_text(raw_text: str) -> str:
 # Parameter extraction
 # ---------------------------------------------------------------------------
 
+# Distinct texts whose parse results are memoised; Streamlit reruns the
+# script on every widget change and re-parses the same report text.
+_PARSE_CACHE_SIZE = 64
+
 # Regex to capture a floating-point or integer number
 _NUM_RE = r"(\d+(?:\.\d+)?)"
+_DIGIT_RE = re.compile(r"\d")
+
+
+@lru_cache(maxsize=None)
+def _compile_alias_pattern(alias: str) -> "re.Pattern[str]":
+    """Compile the pattern matching ``alias`` followed by a numeric value.
+
+    Every pattern opens with the escaped alias as a literal prefix and runs
+    against already-lowercased text, so no ``IGNORECASE`` is needed.
+    ``\\s``/``\\d`` stay Unicode-aware because ``parse_parameters`` also
+    accepts raw text (NBSP separators, non-ASCII digits). Compiled on first
+    use, so aliases that never occur in a report are never compiled.
+    """
+    return re.compile(
+        rf"(?:^|[\s,;:(])"     # word boundary / separator before
+        rf"{re.escape(alias)}"
+        rf"[\s:=\-–]*"         # separator between name and value
+        rf"{_NUM_RE}"           # the numeric value
+    )
+
+
+# (alias, canonical) in match-priority order (longest alias first).
+_ALIAS_TABLE: Tuple[Tuple[str, str], ...] = tuple(
+    (alias, PARAMETER_ALIASES[alias]) for alias in _SORTED_ALIASES
+)
 
 
 def parse_parameters(text: str) -> Dict[str, Dict[str, Any]]:
@@ -284,10 +326,23 @@ def parse_parameters(text: str) -> Dict[str, Dict[str, Any]]:
         Dictionary mapping canonical parameter keys to
         ``{"value": float, "raw_match": str}``.
     """
-    if not text:
-        return {}
+    if not text or not _DIGIT_RE.search(text):
+        return {}  # every alias pattern needs a number, e.g. demographics-only pages
+    return {
+        canonical: {"value": value, "raw_match": raw_match}
+        for canonical, value, raw_match in _parse_parameters_cached(text)
+    }
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_parameters_cached(text: str) -> Tuple[Tuple[str, float, str], ...]:
+    """Memoised core of ``parse_parameters``.
 
-    results: Dict[str, Dict[str, Any]] = {}
+    Returns immutable ``(canonical, value, raw_match)`` triples so cached
+    results cannot be mutated by callers; the public wrapper rebuilds a fresh
+    dict on every call.
+    """
+    results: Dict[str, Tuple[float, str]] = {}
     text_lower = text.lower()
     matched_spans: List[Tuple[int, int]] = []  # track (start, end) of matched regions
 
@@ -298,46 +353,68 @@ def parse_parameters(text: str) -> Dict[str, Dict[str, Any]]:
                 return True
         return False
 
-    for alias in _SORTED_ALIASES:
-        canonical = PARAMETER_ALIASES[alias]
+    for alias, canonical in _ALIAS_TABLE:
         if canonical in results:
             continue  # already found via a longer/earlier alias
+        if alias not in text_lower:
+            continue  # cheap substring prescreen; most aliases are absent
 
-        # Build a pattern that looks for the alias followed by a number
-        escaped = re.escape(alias)
-        pattern = (
-            rf"(?:^|[\s,;:(])"     # word boundary / separator before
-            rf"{escaped}"
-            rf"[\s:=\-–]*"         # separator between name and value
-            rf"{_NUM_RE}"           # the numeric value
-        )
-
-        match = re.search(pattern, text_lower)
+        match = _compile_alias_pattern(alias).search(text_lower)
         if match:
             if _overlaps(match.start(), match.end()):
                 continue  # this text region was already consumed
-            try:
-                value = float(match.group(1))
-                results[canonical] = {
-                    "value": value,
-                    "raw_match": match.group(0).strip(),
-                }
-                matched_spans.append((match.start(), match.end()))
-            except (ValueError, IndexError):
-                continue
+            # _NUM_RE only captures digits with at most one inner '.', so
+            # float() cannot fail here.
+            results[canonical] = (float(match.group(1)), match.group(0).strip())
+            matched_spans.append((match.start(), match.end()))
 
-    return results
+    return tuple((canonical, value, raw_match)
+                 for canonical, (value, raw_match) in results.items())
 
 
 # ---------------------------------------------------------------------------
 # Patient info extraction
 # ---------------------------------------------------------------------------
 
+# One sub-pattern per field, each with a single named value group. Field
+# keywords never share a prefix at the same offset, so at most one branch can
+# match at any position.
+_PATIENT_FIELD_PATTERNS = (
+    # Name — bounded quantifiers prevent ReDoS; capture group requires
+    # a leading letter so it cannot overlap with preceding \s{0,3}.
+    # Use literal space [ ] in the capture group (not \s) to prevent
+    # matching across newlines — names should stay on one line.
+    r"(?:patient\s{0,5}name|name)\s{0,3}[:=\-]\s{0,3}"
+    r"(?P<name>[A-Za-z][A-Za-z.]*(?:[ \-'][A-Za-z][A-Za-z.]*){0,5})",
+    # Age
+    r"(?:age)\s{0,3}[:=\-]\s{0,3}(?P<age>\d{1,3})",
+    # Sex / Gender
+    r"(?:sex|gender)\s{0,3}[:=\-]\s{0,3}(?P<sex>male|female|m|f)\b",
+    # Date
+    r"(?:date|collected|reported|sample date)\s{0,3}[:=\-]\s{0,3}"
+    r"(?P<date>\d{1,2}[\-/]\d{1,2}[\-/]\d{2,4})",
+    # Lab / Hospital — use [^\n] instead of . to avoid matching across lines
+    r"(?:lab(?:oratory)?|hospital|clinic|centre|center)\s{0,3}[:=\-]\s{0,3}(?P<lab>[^\n]{2,80})",
+    # Patient / Sample ID
+    r"(?:patient\s{0,3}id|sample\s{0,3}id|mrn|uhid|reg(?:istration)?\.?\s{0,3}no)"
+    r"\s{0,3}[:=\-]\s{0,3}(?P<id>\S+)",
+)
+_PATIENT_FIELDS = ("name", "age", "sex", "date", "lab", "id")
+
+# Zero-width alternation: finditer visits every offset in a single pass and
+# reports whichever field matches there, so fields can overlap each other
+# exactly as independent searches would.
+_PATIENT_INFO_RE = re.compile(
+    "(?=" + "|".join(f"(?:{p})" for p in _PATIENT_FIELD_PATTERNS) + ")",
+    re.IGNORECASE,
+)
+
+
 def extract_patient_info(text: str) -> Dict[str, str]:
     """Extract patient demographic information from report text.
 
     Looks for common fields: name, age, sex/gender, date, lab/hospital,
-    and patient/sample ID.
+    and patient/sample ID. The first occurrence of each field wins.
 
     Args:
         text: Raw or preprocessed report text.
@@ -345,66 +422,31 @@ def extract_patient_info(text: str) -> Dict[str, str]:
     Returns:
         Dictionary with found patient info fields (may be empty).
     """
-    info: Dict[str, str] = {}
     if not text:
-        return info
-
-    # Name — bounded quantifiers prevent ReDoS; capture group requires
-    # a leading letter so it cannot overlap with preceding \s{0,3}.
-    # Use literal space [ ] in the capture group (not \s) to prevent
-    # matching across newlines — names should stay on one line.
-    name_match = re.search(
-        r"(?:patient\s{0,5}name|name)\s{0,3}[:=\-]\s{0,3}"
-        r"([A-Za-z][A-Za-z.]*(?:[ \-'][A-Za-z][A-Za-z.]*){0,5})",
-        text, re.IGNORECASE,
-    )
-    if name_match:
-        info["name"] = name_match.group(1).strip()
-
-    # Age
-    age_match = re.search(
-        r"(?:age)\s{0,3}[:=\-]\s{0,3}(\d{1,3})\s*(?:y(?:ears?|rs?)?)?",
-        text, re.IGNORECASE,
-    )
-    if age_match:
-        info["age"] = age_match.group(1).strip()
-
-    # Sex / Gender
-    sex_match = re.search(
-        r"(?:sex|gender)\s{0,3}[:=\-]\s{0,3}(male|female|m|f)\b",
-        text, re.IGNORECASE,
-    )
-    if sex_match:
-        raw = sex_match.group(1).strip().lower()
-        info["sex"] = "male" if raw in ("m", "male") else "female"
+        return {}
+    return dict(_extract_patient_info_cached(text))
 
-    # Date
-    date_match = re.search(
-        r"(?:date|collected|reported|sample date)\s{0,3}[:=\-]\s{0,3}"
-        r"(\d{1,2}[\-/]\d{1,2}[\-/]\d{2,4})",
-        text, re.IGNORECASE,
-    )
-    if date_match:
-        info["date"] = date_match.group(1).strip()
 
-    # Lab / Hospital — use [^\n] instead of . to avoid matching across lines
-    lab_match = re.search(
-        r"(?:lab(?:oratory)?|hospital|clinic|centre|center)\s{0,3}[:=\-]\s{0,3}([^\n]{2,80})",
-        text, re.IGNORECASE,
-    )
-    if lab_match:
-        info["lab"] = lab_match.group(1).strip()
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _extract_patient_info_cached(text: str) -> Tuple[Tuple[str, str], ...]:
+    """Memoised core of ``extract_patient_info`` returning ``(field, value)`` pairs."""
+    info: List[Tuple[str, str]] = []
+    found: Dict[str, str] = {}
+    for match in _PATIENT_INFO_RE.finditer(text):
+        field = match.lastgroup
+        if field not in found:
+            found[field] = match.group(field)
+            if len(found) == len(_PATIENT_FIELDS):
+                break
 
-    # Patient / Sample ID
-    id_match = re.search(
-        r"(?:patient\s{0,3}id|sample\s{0,3}id|mrn|uhid|reg(?:istration)?\.?\s{0,3}no)"
-        r"\s{0,3}[:=\-]\s{0,3}(\S+)",
-        text, re.IGNORECASE,
-    )
-    if id_match:
-        info["id"] = id_match.group(1).strip()
+    for field in _PATIENT_FIELDS:
+        if field in found:
+            value = found[field].strip()
+            if field == "sex":
+                value = "male" if value.lower() in ("m", "male") else "female"
+            info.append((field, value))
 
-    return info
+    return tuple(info)
 
 
 # ---------------------------------------------------------------------------
@@ -414,7 +456,7 @@ def extract_patient_info(text: str) -> Dict[str, str]:
 def _extract_text_from_pdf(file_bytes: bytes) -> str:
     """Extract text from a PDF using available libraries.
 
-    Tries pdfplumber first, falls back to PyPDF2, then to pytesseract
+    Tries pdfplumber first, falls back to PyPDF2, then to Tesseract OCR
     via pdf2image for scanned PDFs.
 
     Args:
@@ -423,18 +465,36 @@ def _extract_text_from_pdf(file_bytes: bytes) -> str:
     Returns:
         Extracted text string.
     """
-    text = ""
+    # Page texts are collected and joined once; each strategy appends to the
+    # same list, and a strategy only returns once some page has real text.
+    pages: List[str] = []
 
     # Strategy 1: pdfplumber (best for digital PDFs)
     try:
         import pdfplumber
         with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
+            n_pages = len(pdf.pages)
+            for page_no, page in enumerate(pdf.pages):
                 page_text = page.extract_text()
                 if page_text:
-                    text += page_text + "\n"
-        if text.strip():
-            return text
+                    pages.append(page_text)
+                if not _has_text(pages):
+                    if page_no + 1 >= _PDF_SCAN_PROBE_PAGES:
+                        # No text layer on any of the first pages: most
+                        # likely a scanned PDF, so skip layout analysis of
+                        # the rest. A scanned cover page alone (mixed
+                        # documents) does not trigger this.
+                        break
+                    continue
+                if page_no == 0:
+                    if n_pages >= _PDF_PARALLEL_MIN_PAGES and (os.cpu_count() or 1) > 1:
+                        rest = _pdfplumber_pages_parallel(file_bytes, n_pages)
+                        if rest is not None:
+                            pages.extend(rest)
+                            break
+                        # Pool unavailable: carry on with the sequential loop.
+        if _has_text(pages):
+            return _join_pages(pages)
     except Exception as exc:
         logger.debug("pdfplumber failed: %s", exc)
 
@@ -445,29 +505,238 @@ def _extract_text_from_pdf(file_bytes: bytes) -> str:
         for page in reader.pages:
             page_text = page.extract_text()
             if page_text:
-                text += page_text + "\n"
-        if text.strip():
-            return text
+                pages.append(page_text)
+        if _has_text(pages):
+            return _join_pages(pages)
     except Exception as exc:
         logger.debug("PyPDF2 failed: %s", exc)
 
-    # Strategy 3: OCR via pdf2image + pytesseract (for scanned PDFs)
+    # Strategy 3: OCR via pdf2image + Tesseract (for scanned PDFs).
+    # Each OCR worker renders and OCRs its own page, so rasterisation of later
+    # pages overlaps OCR of earlier ones and at most one rendered page per
+    # worker is held in memory.
+    try:
+        from importlib.util import find_spec
+        from pdf2image import pdfinfo_from_bytes
+        if find_spec("tesserocr") is None and find_spec("pytesseract") is None:
+            raise ImportError("neither tesserocr nor pytesseract is installed")
+        n_pages = int(pdfinfo_from_bytes(file_bytes).get("Pages", 0))
+        if n_pages:
+            page_texts = _run_ocr(
+                _ocr_pdf_page, [(file_bytes, page_number) for page_number in range(1, n_pages + 1)])
+            pages.extend(page_text for page_text in page_texts if page_text)
+    except Exception as exc:
+        logger.debug("pdf2image/Tesseract OCR failed: %s", exc)
+
+    return _join_pages(pages)
+
+
+# Leading pages without a text layer after which a PDF is treated as scanned.
+_PDF_SCAN_PROBE_PAGES = 3
+
+# pdfplumber's layout analysis is pure Python, so long text PDFs are split
+# across processes; below this page count pool start-up costs more than it saves.
+_PDF_PARALLEL_MIN_PAGES = 8
+
+
+def _pdfplumber_page_range(file_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Process-pool worker: non-empty texts of pages ``start``..``stop - 1``."""
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        texts = (pdf.pages[i].extract_text() for i in range(start, stop))
+        return [text for text in texts if text]
+
+
+def _pdfplumber_pages_parallel(file_bytes: bytes, n_pages: int) -> Optional[List[str]]:
+    """Extract pages 1.. (0-based; page 0 is already done) in page order.
+
+    Each worker opens the PDF once and handles one contiguous block of
+    pages, so the document is pickled and parsed once per worker. Workers
+    are spawned rather than forked, since forking the multi-threaded
+    Streamlit server can deadlock. Returns None if the pool fails for any
+    reason (spawn/pickling errors, a broken pool), so the caller can fall
+    back to extracting the pages itself.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    workers = min(os.cpu_count() or 1, n_pages - 1)
+    bounds = [1 + (n_pages - 1) * k // workers for k in range(workers + 1)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            blocks = pool.map(
+                _pdfplumber_page_range, [file_bytes] * workers, bounds[:-1], bounds[1:])
+            return [text for block in blocks for text in block]
+    except Exception as exc:
+        logger.debug("parallel pdfplumber extraction failed, continuing sequentially: %s", exc)
+        return None
+
+
+def _has_text(pages: List[str]) -> bool:
+    return any(not page.isspace() for page in pages)
+
+
+def _join_pages(pages: List[str]) -> str:
+    """Newline-terminate each page, matching the old per-page concatenation."""
+    return "\n".join(pages) + "\n" if pages else ""
+
+
+def _ocr_pdf_page(file_bytes: bytes, page_number: int) -> str:
+    """Render and OCR one (1-based) PDF page; a failed page yields empty text."""
     try:
         from pdf2image import convert_from_bytes
-        import pytesseract
-        images = convert_from_bytes(file_bytes)
-        for img in images:
-            page_text = pytesseract.image_to_string(img)
-            if page_text:
-                text += page_text + "\n"
+        images = convert_from_bytes(file_bytes, first_page=page_number, last_page=page_number)
+        return _ocr_image(images[0]) if images else ""
     except Exception as exc:
-        logger.debug("pdf2image/pytesseract OCR failed: %s", exc)
+        logger.debug("OCR failed on a PDF page: %s", exc)
+        return ""
+
 
-    return text
+# Scanned pages and image uploads are OCR'd in one long-lived pool of worker
+# processes, spawned rather than forked like the pdfplumber pool. Workers
+# outlive individual uploads, so each loads the Tesseract model once, and
+# OMP_THREAD_LIMIT is set only in the workers, leaving numba/BLAS threads in
+# the app process alone.
+_OCR_POOL = None
+_OCR_POOL_LOCK = threading.Lock()
+
+
+def _init_ocr_worker(single_thread: bool) -> None:
+    """OCR pool initializer; runs before any OCR library loads in the worker.
+
+    OpenMP reads its thread limit once, when the runtime first loads, and
+    pytesseract's tesseract subprocesses inherit it. An explicit
+    OMP_THREAD_LIMIT in the environment wins.
+    """
+    if single_thread:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _ocr_pool():
+    """Return the shared OCR process pool, starting it on first use."""
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _OCR_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 4,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+                initargs=(OCR_SINGLE_THREAD_TESSERACT,),
+            )
+        return _OCR_POOL
+
+
+def _run_ocr(fn, calls: List[tuple]) -> list:
+    """Run ``fn(*args)`` for each of ``calls`` on the OCR pool, results in order.
+
+    Exceptions raised by ``fn`` propagate. If the pool cannot start or breaks
+    (e.g. a worker crashed), it is discarded so the next call starts a fresh
+    one, and this call's work runs in the current process instead.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+    try:
+        pool = _ocr_pool()
+        futures = [pool.submit(fn, *args) for args in calls]
+    except Exception as exc:
+        return _run_ocr_in_process(fn, calls, exc)
+    try:
+        return [future.result() for future in futures]
+    except BrokenProcessPool as exc:
+        return _run_ocr_in_process(fn, calls, exc)
+
+
+def _run_ocr_in_process(fn, calls: List[tuple], exc: Exception) -> list:
+    global _OCR_POOL
+    logger.debug("OCR pool failed, running OCR in-process: %s", exc)
+    with _OCR_POOL_LOCK:
+        pool, _OCR_POOL = _OCR_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+    return [fn(*args) for args in calls]
+
+
+# Long-edge pixel cap for OCR input. pdf2image renders PDF pages at 200 DPI
+# (~2200 px on A4/Letter), so this mainly shrinks high-resolution photos.
+_OCR_MAX_EDGE = 2400
+
+# One tesserocr API per process (i.e. per OCR worker), kept for the life of
+# the process so the language model loads once. libtesseract handles are not
+# thread-safe, and the in-process fallback of _run_ocr can run in several
+# session threads, so every use goes through _TESS_LOCK.
+_TESS_API = None
+_TESS_LOCK = threading.Lock()
+
+
+def _tesserocr_api():
+    """Return this process's tesserocr API, or None when tesserocr is unusable.
+
+    Call with _TESS_LOCK held.
+    """
+    global _TESS_API
+    if _TESS_API is None:
+        try:
+            from tesserocr import PyTessBaseAPI
+            _TESS_API = PyTessBaseAPI()
+        except Exception as exc:  # not installed, or tessdata not found
+            logger.debug("tesserocr unavailable, using pytesseract: %s", exc)
+            _TESS_API = False
+    return _TESS_API or None
+
+
+def _ocr_image(image) -> str:
+    """OCR a PIL image after downscaling and binarisation.
+
+    Uses tesserocr's in-process libtesseract binding when installed, which
+    avoids pytesseract's tesseract subprocess and temp-file round trip per
+    call; falls back to pytesseract otherwise.
+    """
+    image = _prepare_for_ocr(image)
+    with _TESS_LOCK:
+        api = _tesserocr_api()
+        if api is not None:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+    import pytesseract
+    return pytesseract.image_to_string(image)
+
+
+def _prepare_for_ocr(image):
+    """Downscale an oversized PIL image and Otsu-threshold it to black/white.
+
+    Tesseract's runtime grows with pixel count, so images whose long edge
+    exceeds ``_OCR_MAX_EDGE`` (typically phone photos) are shrunk first.
+    OpenCV's vectorised colour conversion and thresholding then let
+    Tesseract skip its own binarisation; without OpenCV the image is only
+    downscaled. Transparent images are flattened onto white first, since
+    dropping the alpha channel would turn a clear background black.
+    """
+    from PIL import Image
+
+    width, height = image.size
+    scale = _OCR_MAX_EDGE / max(width, height, 1)
+    if scale < 1:
+        image = image.resize((int(width * scale), int(height * scale)), Image.LANCZOS)
+
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        rgba = image.convert("RGBA")
+        white = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(white, rgba).convert("RGB")
+
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return image
+
+    gray = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return Image.fromarray(binary)
 
 
 def _extract_text_from_image(file_bytes: bytes) -> str:
-    """Extract text from an image file using pytesseract OCR.
+    """Extract text from an image file using Tesseract OCR.
 
     Args:
         file_bytes: Raw bytes of the image file.
@@ -476,15 +745,27 @@ def _extract_text_from_image(file_bytes: bytes) -> str:
         Extracted text string.
     """
     try:
-        from PIL import Image
-        import pytesseract
-        img = Image.open(io.BytesIO(file_bytes))
-        return pytesseract.image_to_string(img)
+        return _run_ocr(_ocr_image_file, [(file_bytes,)])[0]
     except Exception as exc:
         logger.warning("Image OCR failed: %s", exc)
         return ""
 
 
+def _ocr_image_file(file_bytes: bytes) -> str:
+    """OCR worker: decode an image file and OCR it."""
+    from PIL import Image
+    return _ocr_image(Image.open(io.BytesIO(file_bytes)))
+
+
+# Processed uploads keyed by (extension, content digest), least recently used
+# first. Streamlit hands the same file back on every rerun, and text
+# extraction/OCR dominates processing time. Shared by every Streamlit session
+# thread, so all reads and writes go through _UPLOAD_CACHE_LOCK; cached values
+# are never mutated, so copying them can happen outside the lock.
+_UPLOAD_CACHE: "OrderedDict[Tuple[str, bytes], tuple]" = OrderedDict()
+_UPLOAD_CACHE_LOCK = threading.Lock()
+
+
 def process_uploaded_file(
     uploaded_file,
 ) -> Tuple[str, Dict[str, Dict[str, Any]], Dict[str, list], Dict[str, str]]:
@@ -516,6 +797,14 @@ def process_uploaded_file(
 
     ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
 
+    cache_key = (ext, hashlib.blake2b(file_bytes, digest_size=16).digest())
+    with _UPLOAD_CACHE_LOCK:
+        cached = _UPLOAD_CACHE.get(cache_key)
+        if cached is not None:
+            _UPLOAD_CACHE.move_to_end(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     if ext == "pdf":
         raw_text = _extract_text_from_pdf(file_bytes)
     elif ext in ("png", "jpg", "jpeg", "tiff", "bmp"):
@@ -539,4 +828,12 @@ def process_uploaded_file(
         if found:
             grouped[panel_key] = found
 
-    return raw_text, params, grouped, patient_info
+    result = (raw_text, params, grouped, patient_info)
+    if OCR_CACHE_SIZE > 0:
+        snapshot = copy.deepcopy(result)
+        with _UPLOAD_CACHE_LOCK:
+            _UPLOAD_CACHE[cache_key] = snapshot
+            _UPLOAD_CACHE.move_to_end(cache_key)
+            while len(_UPLOAD_CACHE) > OCR_CACHE_SIZE:
+                _UPLOAD_CACHE.popitem(last=False)
+    return result